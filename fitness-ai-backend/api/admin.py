@@ -13,10 +13,27 @@ class FitnessActivityAdmin(admin.ModelAdmin):
     search_fields = ('name', 'category', 'target_muscles')
     list_filter = ('category', 'intensity', 'difficulty_level')
 
+# Read-only: activity writes also refresh the set aggregates, daily rollups,
+# personal records and sync tombstones (see ActivitySerializer and the activity
+# views), which admin saves and deletes would bypass
+@admin.register(Activity)
+class ActivityAdmin(admin.ModelAdmin):
+    list_display = ('name', 'user', 'date', 'fitness_activity', 'set_count', 'total_volume')
+    search_fields = ('name', 'user__username')
+    list_filter = ('date',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 # You can also register other models to see them
 admin.site.register(User)
 admin.site.register(Profile)
-admin.site.register(Activity)
 admin.site.register(TrainingCategory)
 admin.site.register(Workout)
 admin.site.register(Exercise)
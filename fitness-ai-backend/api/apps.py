@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class ApiConfig(AppConfig):
+    name = 'api'
+
+    def ready(self):
+        # Register signal handlers that keep in-memory indexes in sync
+        from . import signals  # noqa: F401
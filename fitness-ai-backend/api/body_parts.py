@@ -0,0 +1,94 @@
+import re
+
+# Canonical body part -> words users commonly type for it
+BODY_PART_SYNONYMS = {
+    'knee': ['knees', 'patella', 'kneecap', 'knee cap', 'meniscus', 'acl', 'mcl'],
+    'lower back': ['lumbar', 'lumbar spine', 'low back', 'lower spine', 'lumbago'],
+    'back': ['spine', 'upper back', 'mid back', 'thoracic', 'thoracic spine'],
+    'neck': ['cervical', 'cervical spine', 'nape'],
+    'shoulder': ['shoulders', 'rotator cuff', 'deltoid', 'deltoids', 'delts'],
+    'elbow': ['elbows', 'forearm', 'forearms'],
+    'wrist': ['wrists', 'carpal'],
+    'hip': ['hips', 'pelvis', 'hip flexor', 'hip flexors', 'glute', 'glutes'],
+    'groin': ['adductor', 'adductors', 'inner thigh'],
+    'hamstring': ['hamstrings', 'back of thigh', 'back of the thigh'],
+    'outer thigh': ['it band', 'itb', 'iliotibial band'],
+    'thigh': ['thighs', 'quad', 'quads', 'quadriceps'],
+    'shin': ['shins', 'tibia', 'lower leg'],
+    'ankle': ['ankles', 'talus'],
+    'achilles tendon': ['achilles', 'heel cord'],
+    'foot': ['feet', 'heel', 'heels', 'arch', 'sole', 'plantar', 'toe', 'toes'],
+    'chest': ['pec', 'pecs', 'pectoral', 'pectorals', 'ribs', 'rib cage', 'sternum'],
+    'head': ['skull', 'forehead', 'temple'],
+    'bones': ['bone', 'skeleton'],
+    'skin': ['scrape', 'blister'],
+    'muscle group': ['muscle', 'muscles'],
+    'soft tissue': ['tissue', 'ligament', 'ligaments'],
+}
+
+# Broader parts an injury should also be found under, e.g. a lower back
+# injury is a back injury too
+BODY_PART_PARENTS = {
+    'lower back': ['back'],
+    'outer thigh': ['thigh'],
+    'hamstring': ['thigh'],
+    'achilles tendon': ['ankle'],
+}
+
+# Qualifiers that don't change which part is meant
+IGNORED_WORDS = {'any', 'my', 'the', 'left', 'right', 'both', 'side', 'area', 'region'}
+
+SYNONYM_TO_PART = {part: part for part in BODY_PART_SYNONYMS}
+for _part, _synonyms in BODY_PART_SYNONYMS.items():
+    for _synonym in _synonyms:
+        SYNONYM_TO_PART[_synonym] = _part
+
+_PHRASE_SEPARATORS = re.compile(r',|/|&|;|\bor\b|\band\b')
+
+
+def _normalize(text):
+    words = re.sub(r'[^a-z0-9 ]+', ' ', text.lower()).split()
+    return ' '.join(word for word in words if word not in IGNORED_WORDS)
+
+
+def canonical_part(phrase):
+    """Maps a normalized phrase to its canonical body part (or itself if unknown)."""
+    if phrase in SYNONYM_TO_PART:
+        return SYNONYM_TO_PART[phrase]
+    if phrase.endswith('s') and phrase[:-1] in SYNONYM_TO_PART:
+        return SYNONYM_TO_PART[phrase[:-1]]
+    return phrase
+
+
+def _phrases(text):
+    phrases = (_normalize(phrase) for phrase in _PHRASE_SEPARATORS.split(text.lower()))
+    return [phrase for phrase in phrases if phrase]
+
+
+def injury_tokens(affected_part):
+    """
+    Tokens an injury is indexed under, e.g. 'Lower Back' -> {'lower back', 'back'}
+    and 'Shoulder or Hip' -> {'shoulder', 'hip'}. Migration 0003 backfills with
+    its own frozen copy of this and the tables above.
+    """
+    tokens = set()
+    for phrase in _phrases(affected_part):
+        part = canonical_part(phrase)
+        tokens.add(part)
+        tokens.update(BODY_PART_PARENTS.get(part, []))
+    return tokens
+
+
+def query_tokens(body_part):
+    """Canonical parts for user input, e.g. 'Left Patella' -> {'knee'}."""
+    return {canonical_part(phrase) for phrase in _phrases(body_part)}
+
+
+def query_word_tokens(body_part):
+    """
+    Looser fallback for free text such as 'pain in my lumbar area':
+    canonicalizes every word and two-word sequence on its own.
+    """
+    words = _normalize(body_part).split()
+    candidates = words + [' '.join(pair) for pair in zip(words, words[1:])]
+    return {canonical_part(candidate) for candidate in candidates}
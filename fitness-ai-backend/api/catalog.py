@@ -0,0 +1,214 @@
+import logging
+import re
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+from .dataset_versions import get_dataset_version, bump_dataset_version
+from .models import FitnessActivity
+from .serializers import FitnessActivitySerializer
+
+logger = logging.getLogger(__name__)
+
+CATALOG_DATASET = 'fitness_activities'
+# Minimum trigram similarity for a logged activity name to link to the catalog
+NAME_MATCH_THRESHOLD = 0.4
+
+
+class CatalogActivity:
+    """
+    Compact, read-only copy of one active FitnessActivity, holding exactly the
+    fields FitnessActivitySerializer returns.
+    """
+    __slots__ = tuple(FitnessActivitySerializer.Meta.fields)
+
+    def __init__(self, *values):
+        for field, value in zip(self.__slots__, values):
+            setattr(self, field, value)
+
+    def as_dict(self):
+        """Same structure as FitnessActivitySerializer(activity).data."""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f'<CatalogActivity {self.id}: {self.name}>'
+
+
+def parse_muscle_groups(target_muscles):
+    """'Chest, Shoulders, Triceps' -> ['chest', 'shoulders', 'triceps']"""
+    groups = (group.strip().lower() for group in re.split(r'[,/&]|\band\b', target_muscles or ''))
+    return [group for group in groups if group]
+
+
+def normalize_name(name):
+    """Lowercased words without punctuation, e.g. "Farmer's Walk" -> 'farmers walk'."""
+    return ' '.join(re.sub(r'[^a-z0-9 ]+', ' ', re.sub(r"['\u2019`]", '', (name or '').lower())).split())
+
+
+def name_trigrams(normalized):
+    """Distinct character trigrams of each word, padded like pg_trgm ('  w', ' wo', ...)."""
+    grams = set()
+    for word in normalized.split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NameIndex:
+    """
+    Character-trigram inverted index over catalog names, for linking free-text
+    activity names to catalog rows without LIKE scans.
+    """
+
+    def __init__(self, names):
+        self.exact = {}
+        self.gram_counts = np.zeros(len(names), dtype=np.int32)
+        postings = defaultdict(list)
+        for row, name in enumerate(names):
+            normalized = normalize_name(name)
+            self.exact.setdefault(normalized, row)
+            grams = name_trigrams(normalized)
+            self.gram_counts[row] = len(grams)
+            for gram in grams:
+                postings[gram].append(row)
+        self.postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+
+    def best_match(self, name):
+        """
+        (row, similarity) of the closest name, where similarity is the Jaccard
+        index of the trigram sets (1.0 for an exact normalized match), or
+        (None, 0.0) if no name shares a trigram.
+        """
+        normalized = normalize_name(name)
+        if normalized in self.exact:
+            return self.exact[normalized], 1.0
+
+        grams = name_trigrams(normalized)
+        matched = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not matched:
+            return None, 0.0
+        rows, shared = np.unique(np.concatenate(matched), return_counts=True)
+        similarity = shared / (len(grams) + self.gram_counts[rows] - shared)
+        # Best similarity first, then the shorter name, then catalog order
+        best = np.lexsort((rows, self.gram_counts[rows], -similarity))[0]
+        return int(rows[best]), float(similarity[best])
+
+
+class CatalogSnapshot:
+    """
+    Process-local snapshot of the active FitnessActivity catalog, partitioned
+    by (category, difficulty_level) so plan generation needs no DB queries.
+    Also holds column arrays (row i describes activities[i]) for vectorized
+    scoring, see plan_scoring.py.
+    """
+
+    def __init__(self, activities, version=None):
+        self.version = version
+        self.activities = tuple(activities)
+        partitions = defaultdict(list)
+        for activity in self.activities:
+            partitions[(activity.category, activity.difficulty_level)].append(activity)
+        self.partitions = {key: tuple(records) for key, records in partitions.items()}
+        self._build_arrays()
+        self._name_index = None
+
+    def _build_arrays(self):
+        self.ids = np.array([activity.id for activity in self.activities], dtype=np.int64)
+        self._id_order = np.argsort(self.ids)
+
+        self.category_names = sorted({activity.category for activity in self.activities})
+        category_codes = {category: code for code, category in enumerate(self.category_names)}
+        self.category_codes = np.array(
+            [category_codes[activity.category] for activity in self.activities], dtype=np.int16
+        )
+        self.difficulty = np.array([activity.difficulty_level for activity in self.activities], dtype=np.int16)
+
+        # Activity x muscle-group incidence matrix, rows scaled to sum to 1
+        activity_groups = [parse_muscle_groups(activity.target_muscles) for activity in self.activities]
+        self.muscle_groups = sorted({group for groups in activity_groups for group in groups})
+        group_codes = {group: code for code, group in enumerate(self.muscle_groups)}
+        self.muscle_matrix = np.zeros((len(self.activities), len(self.muscle_groups)), dtype=np.float32)
+        for row, groups in enumerate(activity_groups):
+            if groups:
+                self.muscle_matrix[row, [group_codes[group] for group in groups]] = 1.0 / len(groups)
+
+    def rows_for_ids(self, activity_ids):
+        """Maps FitnessActivity ids to snapshot rows; ids not in the snapshot map to -1."""
+        activity_ids = np.asarray(activity_ids, dtype=np.int64)
+        if not len(self.ids):
+            return np.full(len(activity_ids), -1, dtype=np.intp)
+        sorted_ids = self.ids[self._id_order]
+        positions = np.clip(np.searchsorted(sorted_ids, activity_ids), 0, len(sorted_ids) - 1)
+        found = sorted_ids[positions] == activity_ids
+        return np.where(found, self._id_order[positions], -1)
+
+    def category_mask(self, category, min_difficulty=1, max_difficulty=10):
+        """Boolean row mask for activities in a category within a difficulty range."""
+        if category not in self.category_names:
+            return np.zeros(len(self.activities), dtype=bool)
+        return (
+            (self.category_codes == self.category_names.index(category))
+            & (self.difficulty >= min_difficulty)
+            & (self.difficulty <= max_difficulty)
+        )
+
+    @property
+    def name_index(self):
+        # Built on first use; only the activity logging path needs it
+        if self._name_index is None:
+            self._name_index = NameIndex([activity.name for activity in self.activities])
+        return self._name_index
+
+    def match_name(self, name, threshold=NAME_MATCH_THRESHOLD):
+        """
+        (activity, similarity) for the catalog activity whose name best matches
+        `name`; activity is None when nothing reaches `threshold`.
+        """
+        row, similarity = self.name_index.best_match(name)
+        if row is None or similarity < threshold:
+            return None, similarity
+        return self.activities[row], similarity
+
+    def __len__(self):
+        return len(self.activities)
+
+    def select(self, category, min_difficulty=1, max_difficulty=10):
+        """Activities in a category within a difficulty range, in catalog order."""
+        selected = []
+        for difficulty in range(min_difficulty, max_difficulty + 1):
+            selected.extend(self.partitions.get((category, difficulty), ()))
+        return selected
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def build_catalog_snapshot(version=None):
+    rows = FitnessActivity.objects.filter(is_active=True).order_by(
+        'category', 'difficulty_level', 'name'
+    ).values_list(*CatalogActivity.__slots__)
+    snapshot = CatalogSnapshot((CatalogActivity(*row) for row in rows), version=version)
+    logger.info(f"Fitness activity catalog snapshot built with {len(snapshot)} activities (version {version}).")
+    return snapshot
+
+
+def get_catalog_snapshot():
+    """
+    Returns the process-wide catalog snapshot, rebuilding it if the catalog
+    version has moved on since it was taken.
+    """
+    global _snapshot
+    version = get_dataset_version(CATALOG_DATASET)
+    snapshot = _snapshot
+    if snapshot is None or snapshot.version != version:
+        with _snapshot_lock:
+            if _snapshot is None or _snapshot.version != version:
+                _snapshot = build_catalog_snapshot(version)
+            snapshot = _snapshot
+    return snapshot
+
+
+def invalidate_catalog_snapshot():
+    bump_dataset_version(CATALOG_DATASET)
@@ -0,0 +1,56 @@
+import time
+
+from django.core.cache import cache
+
+from .dataset_versions import get_dataset_version, bump_dataset_version
+
+DASHBOARD_CACHE_TIMEOUT = 60 * 60 * 24
+# A build that takes longer than this lets another request start its own
+BUILD_LOCK_TIMEOUT = 30
+# How long a request waits for a concurrent build before building itself
+BUILD_WAIT_SECONDS = 5
+BUILD_POLL_SECONDS = 0.05
+
+
+def _version_name(user_id):
+    return f'dashboard:{user_id}'
+
+
+def invalidate_dashboard(user_id):
+    """Moves the user's dashboard to a new version; call after their training data changed."""
+    bump_dataset_version(_version_name(user_id))
+
+
+def get_or_build_dashboard(user_id, today, build, variant=''):
+    """
+    The user's cached dashboard for `today` and `variant` (the requested window),
+    or the result of build(), cached under the user's current dashboard version.
+    Concurrent misses for the same key build once: the request that takes the
+    lock builds, the others poll the cache for its result.
+    """
+    version = get_dataset_version(_version_name(user_id))
+    key = f'performance_dashboard:{user_id}:{version}:{today.isoformat()}:{variant}'
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, True, timeout=BUILD_LOCK_TIMEOUT):
+        try:
+            data = build()
+            cache.set(key, data, timeout=DASHBOARD_CACHE_TIMEOUT)
+        finally:
+            cache.delete(lock_key)
+        return data
+
+    deadline = time.monotonic() + BUILD_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(BUILD_POLL_SECONDS)
+        data = cache.get(key)
+        if data is not None:
+            return data
+        if cache.get(lock_key) is None:
+            break
+    # The other build failed or is too slow; build without caching over it
+    data = cache.get(key)
+    return data if data is not None else build()
@@ -0,0 +1,42 @@
+import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import DatasetVersion
+
+# Versions live in the database rather than the cache: a local-memory cache is
+# per process, so a bump from a management command or another worker would go
+# unnoticed, and cache eviction could silently reset a version.
+
+
+def _fresh_version():
+    # Seeded from the clock so that a recreated row never falls back to a
+    # version number an older in-memory structure was built against.
+    return int(time.time() * 1000)
+
+
+def get_dataset_version(name):
+    """
+    Returns the current version of a named dataset (e.g. 'injuries').
+    Anything derived from the dataset should be rebuilt when this changes.
+    """
+    version = DatasetVersion.objects.filter(name=name).values_list('version', flat=True).first()
+    if version is None:
+        try:
+            with transaction.atomic():
+                version = DatasetVersion.objects.create(name=name, version=_fresh_version()).version
+        except IntegrityError:
+            # Another process created it first
+            version = DatasetVersion.objects.values_list('version', flat=True).get(name=name)
+    return version
+
+
+def bump_dataset_version(name):
+    """
+    Moves a dataset to a new version, invalidating everything built from it.
+    A single UPDATE, as it runs after every training data write.
+    """
+    if not DatasetVersion.objects.filter(name=name).update(version=F('version') + 1):
+        # No version yet: creating one is new enough
+        get_dataset_version(name)
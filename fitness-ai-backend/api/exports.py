@@ -0,0 +1,77 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from .models import Activity, SetLog
+
+# Activities fetched per query; memory use depends on this, not on history size
+EXPORT_CHUNK_SIZE = 500
+
+ACTIVITY_EXPORT_FIELDS = ('id', 'date', 'timestamp', 'name', 'fitness_activity__category', 'duration', 'notes')
+SET_EXPORT_FIELDS = ('id', 'exercise_name', 'weight_kg', 'reps', 'distance_km', 'duration_minutes', 'rest_seconds')
+
+CSV_HEADER = (
+    ['activity_id', 'date', 'timestamp', 'name', 'category', 'duration', 'notes']
+    + ['set_id', 'exercise_name', 'weight_kg', 'reps', 'distance_km', 'duration_minutes', 'rest_seconds']
+)
+
+
+def iter_activity_chunks(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields the user's activities oldest first, in chunks of (activity row, [set rows])
+    pairs. Each chunk costs two queries: the next page of activities by keyset on
+    (date, id), and the sets of just those activities.
+    """
+    activities = Activity.objects.filter(user=user).order_by('date', 'id')
+    last_date = last_id = None
+    while True:
+        page = activities
+        if last_id is not None:
+            page = page.filter(Q(date__gt=last_date) | Q(date=last_date, id__gt=last_id))
+        rows = list(page.values_list(*ACTIVITY_EXPORT_FIELDS)[:chunk_size])
+        if not rows:
+            return
+
+        sets_by_activity = {row[0]: [] for row in rows}
+        set_rows = SetLog.objects.filter(activity_id__in=sets_by_activity).order_by(
+            'activity_id', 'created_at', 'id'
+        ).values_list('activity_id', *SET_EXPORT_FIELDS)
+        for set_row in set_rows:
+            sets_by_activity[set_row[0]].append(set_row[1:])
+
+        yield [(row, sets_by_activity[row[0]]) for row in rows]
+        last_date, last_id = rows[-1][1], rows[-1][0]
+
+
+class _Echo:
+    """File-like object whose write() returns the value, so csv.writer output can be yielded."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(user):
+    """CSV lines, one row per set; activities without sets get one row with empty set columns."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    empty_set = (None,) * len(SET_EXPORT_FIELDS)
+    for chunk in iter_activity_chunks(user):
+        lines = []
+        for activity, sets in chunk:
+            for set_row in sets or [empty_set]:
+                lines.append(writer.writerow(activity + set_row))
+        yield ''.join(lines)
+
+
+def stream_ndjson(user):
+    """One JSON object per line and activity, with its sets nested."""
+    activity_keys = ('id', 'date', 'timestamp', 'name', 'category', 'duration', 'notes')
+    for chunk in iter_activity_chunks(user):
+        lines = []
+        for activity, sets in chunk:
+            record = dict(zip(activity_keys, activity))
+            record['sets'] = [dict(zip(SET_EXPORT_FIELDS, set_row)) for set_row in sets]
+            lines.append(json.dumps(record, cls=DjangoJSONEncoder) + '\n')
+        yield ''.join(lines)
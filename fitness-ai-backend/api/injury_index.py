@@ -0,0 +1,448 @@
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+from django.conf import settings
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .body_parts import injury_tokens, query_tokens, query_word_tokens
+from .dataset_versions import get_dataset_version, bump_dataset_version
+from .models import Injury, InjuryBodyPart
+
+logger = logging.getLogger(__name__)
+
+INJURY_DATASET = 'injuries'
+
+# Matches below this cosine similarity are considered irrelevant
+MIN_SIMILARITY = 0.1
+
+
+class InjuryIndex:
+    """
+    A TF-IDF model fitted once over the symptoms of every active injury.
+    Keeps the sparse symptom matrix plus an inverted index from normalized
+    body-part tokens to matrix rows, so a query only has to transform the
+    user's symptom text and look up its candidate rows.
+    """
+
+    def __init__(self, injuries, tokens_by_injury=None, version=None):
+        self.version = version
+        self.injuries = list(injuries)
+        self.vectorizer = TfidfVectorizer(stop_words='english')
+        self.analyzer = self.vectorizer.build_analyzer()
+        self.matrix = None
+        self.matrix_t = None
+        if self.injuries:
+            try:
+                self.matrix = self.vectorizer.fit_transform([injury.symptoms for injury in self.injuries])
+                # Term-major copy so scoring doesn't re-transpose the corpus per request
+                self.matrix_t = self.matrix.T.tocsr()
+            except ValueError:
+                # Every symptom description was made of stop words only
+                logger.warning("Injury index could not be fitted: empty vocabulary.")
+
+        self._index_body_parts(tokens_by_injury or {})
+
+    @classmethod
+    def from_compiled(cls, injuries, vocabulary, idf, matrix_t, tokens_by_injury=None, version=None):
+        """
+        Builds an index from a previously fitted model without fitting anything.
+        matrix_t is the term-major (vocabulary x injuries) CSR matrix; it may be
+        backed by memory-mapped arrays (see load_injury_index_artifact).
+        """
+        index = cls.__new__(cls)
+        index.version = version
+        index.injuries = list(injuries)
+        index.vectorizer = TfidfVectorizer(stop_words='english', vocabulary=vocabulary)
+        index.vectorizer.idf_ = idf
+        index.analyzer = index.vectorizer.build_analyzer()
+        index.matrix_t = matrix_t
+        index.matrix = matrix_t.T  # A CSC view over the same arrays, no copy
+        index._index_body_parts(tokens_by_injury or {})
+        return index
+
+    def _index_body_parts(self, tokens_by_injury):
+        token_rows = defaultdict(list)
+        part_rows = defaultdict(list)
+        for row, injury in enumerate(self.injuries):
+            tokens = tokens_by_injury.get(injury.pk) or injury_tokens(injury.affected_part)
+            for token in tokens:
+                token_rows[token].append(row)
+            part_rows[injury.affected_part.strip().lower()].append(row)
+        self.token_rows = {token: np.array(rows, dtype=np.intp) for token, rows in token_rows.items()}
+        self.part_rows = {part: np.array(rows, dtype=np.intp) for part, rows in part_rows.items()}
+
+    def __len__(self):
+        return len(self.injuries)
+
+    def _rows_for_tokens(self, tokens):
+        matches = [self.token_rows[token] for token in tokens if token in self.token_rows]
+        if not matches:
+            return None
+        return np.unique(np.concatenate(matches))
+
+    def candidate_rows(self, body_part):
+        """
+        Returns the matrix rows of injuries affecting body_part. Synonyms are
+        resolved through the token index ('patella' finds knee injuries); free
+        text falls back to word-level tokens and then to a substring match on
+        the affected_part names.
+        """
+        needles = query_tokens(body_part)
+        rows = self._rows_for_tokens(needles)
+        if rows is None:
+            rows = self._rows_for_tokens(query_word_tokens(body_part))
+        if rows is None:
+            matches = [
+                part_rows for part, part_rows in self.part_rows.items()
+                if any(needle in part for needle in needles)
+            ]
+            rows = np.unique(np.concatenate(matches)) if matches else np.empty(0, dtype=np.intp)
+        return rows
+
+    def query_key(self, body_part, symptoms_text):
+        """
+        Normalized cache key for a query: the canonical body-part tokens plus the
+        sorted, lower-cased, stop-word-stripped symptom terms. Repeated terms are
+        kept because they change the TF-IDF weights.
+        """
+        return (
+            tuple(sorted(query_tokens(body_part))),
+            tuple(sorted(self.analyzer(symptoms_text))),
+        )
+
+    def score(self, symptoms_text, rows, limit=5):
+        """
+        Scores the user's symptoms against the given candidate rows.
+        Returns up to `limit` (injury, similarity) pairs, best match first.
+        """
+        return self.score_many([symptoms_text], [rows], limit=limit)[0]
+
+    def score_many(self, texts, rows_per_query, limit=5):
+        """
+        Scores many symptom texts at once with a single sparse matrix product.
+        rows_per_query[i] restricts query i to its candidate rows.
+        Returns one list of (injury, similarity) pairs per query.
+        """
+        results = [[] for _ in texts]
+        if self.matrix is None or not texts:
+            return results
+
+        # TF-IDF rows are L2-normalised, so the dot product is the cosine similarity
+        queries = self.vectorizer.transform(texts)
+        sims = (queries @ self.matrix_t).tocsr()
+
+        for i, rows in enumerate(rows_per_query):
+            start, end = sims.indptr[i], sims.indptr[i + 1]
+            cols, vals = sims.indices[start:end], sims.data[start:end]
+            keep = np.isin(cols, rows) & (vals > MIN_SIMILARITY)
+            cols, vals = top_k(cols[keep], vals[keep], limit)
+            results[i] = [(self.injuries[col], float(val)) for col, val in zip(cols, vals)]
+        return results
+
+
+def top_k(rows, scores, k):
+    """
+    Returns the k best (rows, scores), best first, without sorting every score:
+    argpartition selects the k largest in linear time and only those are sorted.
+    Ties keep the corpus (name) order.
+    """
+    if len(scores) > k:
+        # argpartition splits ties at the k-th score arbitrarily, so keep every
+        # row scoring at least that much and let the sort pick the earliest
+        kth_score = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        candidates = np.flatnonzero(scores >= kth_score)
+        rows, scores = rows[candidates], scores[candidates]
+    order = np.lexsort((rows, -scores))[:k]
+    return rows[order], scores[order]
+
+
+class InjuryCheckCache:
+    """
+    Bounded LRU cache of scored injury checks, keyed on InjuryIndex.query_key.
+    Entries belong to a single injury dataset version and are dropped as soon
+    as a lookup arrives for a newer version. Tracks hit rate and latency so the
+    size can be tuned (see INJURY_CHECK_CACHE_SIZE).
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._hit_seconds = 0.0
+        self._miss_seconds = 0.0
+
+    def _check_version(self, version):
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record(self, hit, seconds, count=1):
+        """Records `count` lookups that took `seconds` each."""
+        with self._lock:
+            if hit:
+                self.hits += count
+                self._hit_seconds += seconds * count
+            else:
+                self.misses += count
+                self._miss_seconds += seconds * count
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.maxsize,
+                'dataset_version': self.version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'avg_hit_ms': round(self._hit_seconds / self.hits * 1000, 3) if self.hits else None,
+                'avg_miss_ms': round(self._miss_seconds / self.misses * 1000, 3) if self.misses else None,
+            }
+
+
+_index = None
+_index_lock = threading.Lock()
+_result_cache = None
+
+
+def build_injury_index(version=None):
+    injuries = list(Injury.objects.filter(
+        is_active=True
+    ).exclude(symptoms__isnull=True).exclude(symptoms__exact=''))
+
+    tokens_by_injury = defaultdict(set)
+    for injury_id, token in InjuryBodyPart.objects.filter(
+        injury__in=[injury.pk for injury in injuries]
+    ).values_list('injury_id', 'token'):
+        tokens_by_injury[injury_id].add(token)
+
+    index = InjuryIndex(injuries, tokens_by_injury=tokens_by_injury, version=version)
+    logger.info(f"Injury index built over {len(index)} injuries (version {version}).")
+    return index
+
+
+def get_injury_index():
+    """
+    Returns the process-wide injury index, reloading it if the injury dataset
+    version has moved on. A compiled artifact is preferred over fitting.
+    """
+    global _index
+    version = get_dataset_version(INJURY_DATASET)
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = load_injury_index_artifact(version) or build_injury_index(version)
+            index = _index
+    return index
+
+
+def get_injury_check_cache():
+    """Returns the process-wide injury check result cache."""
+    global _result_cache
+    if _result_cache is None:
+        with _index_lock:
+            if _result_cache is None:
+                _result_cache = InjuryCheckCache(getattr(settings, 'INJURY_CHECK_CACHE_SIZE', 2048))
+    return _result_cache
+
+
+def check_injuries(index, queries, limit=5):
+    """
+    Runs (body_part, symptoms_text) queries through the result cache.
+    Misses are scored together with one InjuryIndex.score_many call.
+    Returns one (candidate_count, [(injury, similarity), ...]) pair per query.
+    """
+    if not queries:
+        return []
+
+    cache = get_injury_check_cache()
+    start = time.perf_counter()
+    results = [None] * len(queries)
+    misses = []  # (position, key, rows)
+
+    for position, (body_part, symptoms_text) in enumerate(queries):
+        key = index.query_key(body_part, symptoms_text)
+        cached = cache.get(key, index.version)
+        if cached is not None:
+            results[position] = cached
+        else:
+            misses.append((position, key, index.candidate_rows(body_part)))
+
+    # Every query pays for the lookup; misses additionally share the scoring time
+    lookup_seconds = (time.perf_counter() - start) / len(queries)
+    cache.record(True, lookup_seconds, count=len(queries) - len(misses))
+
+    if misses:
+        scoring_start = time.perf_counter()
+        scored = index.score_many(
+            [queries[position][1] for position, _, _ in misses],
+            [rows for _, _, rows in misses],
+            limit=limit
+        )
+        for (position, key, rows), sorted_injuries in zip(misses, scored):
+            results[position] = (len(rows), sorted_injuries)
+            cache.put(key, index.version, results[position])
+        scoring_seconds = (time.perf_counter() - scoring_start) / len(misses)
+        cache.record(False, lookup_seconds + scoring_seconds, count=len(misses))
+
+    return results
+
+
+def invalidate_injury_index():
+    bump_dataset_version(INJURY_DATASET)
+
+
+def sync_injury_body_parts(injuries):
+    """Rewrites the InjuryBodyPart lookup rows for the given injuries."""
+    injuries = list(injuries)
+    InjuryBodyPart.objects.filter(injury__in=[injury.pk for injury in injuries]).delete()
+    InjuryBodyPart.objects.bulk_create([
+        InjuryBodyPart(injury=injury, token=token)
+        for injury in injuries
+        for token in sorted(injury_tokens(injury.affected_part))
+    ])
+
+
+# Fields of each injury stored in the artifact, enough to answer a check without the DB
+ARTIFACT_INJURY_FIELDS = (
+    'id', 'name', 'affected_part', 'symptoms', 'first_aid',
+    'treatment_type', 'severity', 'recovery_time_days',
+)
+ARTIFACT_ARRAYS = ('idf', 'data', 'indices', 'indptr')
+
+
+def _artifact_dir(directory=None):
+    directory = directory or getattr(settings, 'INJURY_INDEX_ARTIFACT_DIR', None)
+    return Path(directory) if directory else None
+
+
+def write_injury_index_artifact(index, directory=None):
+    """
+    Writes a fitted index to disk: vocabulary, idf vector and the CSR arrays of
+    the term-major symptom matrix as .npy files, plus injury metadata as JSON.
+    Each compile goes to a fresh build directory and 'current.json' is swapped
+    atomically, so workers never see a half-written artifact.
+    Returns the build directory, or None if there is nothing to write.
+    """
+    directory = _artifact_dir(directory)
+    if directory is None or index.matrix_t is None:
+        return None
+
+    build_dir = directory / f'build-{int(time.time() * 1000)}-{os.getpid()}'
+    build_dir.mkdir(parents=True)
+
+    matrix_t = index.matrix_t
+    np.save(build_dir / 'idf.npy', np.asarray(index.vectorizer.idf_, dtype=np.float64))
+    np.save(build_dir / 'data.npy', matrix_t.data)
+    np.save(build_dir / 'indices.npy', matrix_t.indices)
+    np.save(build_dir / 'indptr.npy', matrix_t.indptr)
+
+    vocabulary = sorted(index.vectorizer.vocabulary_, key=index.vectorizer.vocabulary_.get)
+    tokens_by_row = defaultdict(list)
+    for token, rows in index.token_rows.items():
+        for row in rows:
+            tokens_by_row[row].append(token)
+    metadata = {
+        'shape': list(matrix_t.shape),
+        'vocabulary': vocabulary,
+        'injuries': [
+            {field: getattr(injury, field) for field in ARTIFACT_INJURY_FIELDS}
+            for injury in index.injuries
+        ],
+        'tokens': {
+            str(injury.pk): sorted(tokens_by_row[row])
+            for row, injury in enumerate(index.injuries)
+        },
+    }
+    with open(build_dir / 'metadata.json', 'w', encoding='utf-8') as f:
+        json.dump(metadata, f)
+
+    pointer_tmp = directory / 'current.json.tmp'
+    with open(pointer_tmp, 'w', encoding='utf-8') as f:
+        json.dump({'build': build_dir.name}, f)
+    os.replace(pointer_tmp, directory / 'current.json')
+
+    # Keep the previous build around for workers that still have it mapped
+    builds = sorted(path for path in directory.glob('build-*') if path.is_dir())
+    for old_build in builds[:-2]:
+        shutil.rmtree(old_build, ignore_errors=True)
+    return build_dir
+
+
+def load_injury_index_artifact(version=None, directory=None):
+    """
+    Loads the compiled injury index with its arrays memory-mapped read-only,
+    so every worker process shares the same pages. Returns None if no usable
+    artifact exists.
+    """
+    directory = _artifact_dir(directory)
+    if directory is None:
+        return None
+    try:
+        with open(directory / 'current.json', 'r', encoding='utf-8') as f:
+            build_dir = directory / json.load(f)['build']
+        with open(build_dir / 'metadata.json', 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        arrays = {name: np.load(build_dir / f'{name}.npy', mmap_mode='r') for name in ARTIFACT_ARRAYS}
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable injury index artifact in {directory}: {str(e)}")
+        return None
+
+    matrix_t = sp.csr_matrix(
+        (arrays['data'], arrays['indices'], arrays['indptr']),
+        shape=tuple(metadata['shape']), copy=False
+    )
+    injuries = [Injury(**fields) for fields in metadata['injuries']]
+    tokens_by_injury = {int(pk): set(tokens) for pk, tokens in metadata['tokens'].items()}
+    vocabulary = {term: i for i, term in enumerate(metadata['vocabulary'])}
+
+    index = InjuryIndex.from_compiled(
+        injuries, vocabulary, arrays['idf'], matrix_t,
+        tokens_by_injury=tokens_by_injury, version=version
+    )
+    logger.info(f"Injury index loaded from {build_dir} ({len(index)} injuries, version {version}).")
+    return index
+
+
+def discard_injury_index_artifact(directory=None):
+    """Marks the compiled artifact stale so workers fall back to fitting."""
+    directory = _artifact_dir(directory)
+    if directory is not None:
+        try:
+            os.remove(directory / 'current.json')
+        except FileNotFoundError:
+            pass
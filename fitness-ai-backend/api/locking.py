@@ -0,0 +1,19 @@
+from django.db import connection
+
+from .models import User
+
+
+def lock_user_training_data(user_id):
+    """
+    Serializes writers of a user's derived training rows (daily rollups,
+    personal records) until the current transaction ends. Those rows are
+    rebuilt by delete and insert against unique keys, so two concurrent writers
+    would otherwise both insert the same key. Locks the user row FOR NO KEY
+    UPDATE, which doesn't conflict with the key-share locks the writers' own
+    activity inserts already hold on it. SQLite serializes writers anyway.
+    """
+    features = connection.features
+    if features.has_select_for_update:
+        list(User.objects.select_for_update(
+            no_key=features.has_select_for_no_key_update
+        ).filter(pk=user_id).values_list('pk', flat=True))
@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.dashboard_cache import invalidate_dashboard
+from api.models import User, Activity
+from api.views import (
+    PerformanceDashboardView, CalendarLogView, HealthDataAnalysisView, FoodRecommendationView,
+)
+
+# view, request path, query params, indexes its queries are expected to use
+PLAN_CHECKS = [
+    # Reads the daily rollups, plus the activities of the last 30 days for the most frequent name
+    (PerformanceDashboardView, '/api/performance-dashboard/', {}, ['activity_user_date_idx']),
+    (CalendarLogView, '/api/calendar-logs/', {}, ['activity_user_date_idx']),
+    (HealthDataAnalysisView, '/api/health-data/analysis/', {}, ['healthlog_user_time_idx']),
+    (FoodRecommendationView, '/api/food-recommendations/', {'type': 'veg', 'min_protein': '10'}, ['food_active_type_protein_idx']),
+]
+# The default user should have activities in the dashboard's window
+RECENT_ACTIVITY_DAYS = 30
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs the hot per-user views for one user, EXPLAINs every SELECT they issue and '
+        'checks that the composite indexes for their access patterns are used'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=str,
+            default=None,
+            help='Username to run the views as (default: the user with the most health logs '
+                 'among those with recent activities)',
+        )
+        parser.add_argument(
+            '--no-seqscan',
+            action='store_true',
+            help='PostgreSQL only: disable sequential scans, to check that an index is usable on small tables',
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the plan of every statement',
+        )
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['user'])
+        if options['no_seqscan']:
+            if connection.vendor != 'postgresql':
+                raise CommandError('--no-seqscan is only supported on PostgreSQL.')
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+        self.stdout.write(f'Checking query plans on {connection.vendor} as user {user.username}')
+        # A cached dashboard would issue no queries to check
+        invalidate_dashboard(user.id)
+        factory = APIRequestFactory()
+        index_tables = {
+            index.name: model._meta.db_table
+            for model in apps.get_app_config('api').get_models()
+            for index in model._meta.indexes
+        }
+        failures = 0
+        for view_class, path, params, expected_indexes in PLAN_CHECKS:
+            statements = []
+
+            def capture(execute, sql, sql_params, many, context):
+                if sql.lstrip().upper().startswith('SELECT'):
+                    statements.append((sql, sql_params))
+                return execute(sql, sql_params, many, context)
+
+            request = factory.get(path, params)
+            force_authenticate(request, user=user)
+            with connection.execute_wrapper(capture):
+                response = view_class.as_view()(request)
+
+            plans = [self.explain(sql, sql_params) for sql, sql_params in statements]
+            if options['verbose_plans']:
+                for (sql, _), plan in zip(statements, plans):
+                    self.stdout.write(f'    {sql[:120]}\n      -> {plan}')
+
+            # A view can skip a table altogether for this user's data, e.g. no
+            # recent activities; there's no plan to check for that index then
+            checked = [
+                index for index in expected_indexes
+                if any(f'"{index_tables[index]}"' in sql for sql, _ in statements)
+            ]
+            skipped = [index for index in expected_indexes if index not in checked]
+            used = [index for index in checked if any(self.seeks(index, plan) for plan in plans)]
+            missing = [index for index in checked if index not in used]
+            label = f'{view_class.__name__} ({response.status_code}, {len(statements)} SELECTs)'
+            if skipped:
+                self.stdout.write(self.style.WARNING(
+                    f'  SKIP {label}: no query on the table of {", ".join(skipped)} for this user'
+                ))
+            if missing:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'  FAIL {label}: not seeking via {", ".join(missing)}'))
+            elif used:
+                self.stdout.write(self.style.SUCCESS(f'  OK   {label}: uses {", ".join(used)}'))
+
+        if failures:
+            raise CommandError(
+                f'{failures} view(s) not using their indexes. On PostgreSQL with little data the '
+                'planner prefers sequential scans; rerun with --no-seqscan or on production-sized data.'
+            )
+
+    def get_user(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'User "{username}" does not exist.')
+        recent_activities = Activity.objects.filter(
+            user=OuterRef('pk'), date__gte=timezone.localdate() - timedelta(days=RECENT_ACTIVITY_DAYS)
+        )
+        users = User.objects.annotate(log_count=Count('health_logs')).order_by('-log_count', 'id')
+        user = users.filter(Exists(recent_activities)).first() or users.first()
+        if user is None:
+            raise CommandError('No users found.')
+        return user
+
+    def seeks(self, index, plan):
+        """
+        Whether the plan looks rows up through the index. SQLite reports a full
+        pass over an index as 'SCAN ... USING INDEX', which doesn't count.
+        """
+        steps = [step for step in plan.split(' | ') if index in step]
+        if connection.vendor == 'sqlite':
+            return any(' SEARCH ' in f' {step} ' for step in steps)
+        return bool(steps)
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            return ' | '.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+
+from api.injury_index import build_injury_index, invalidate_injury_index, write_injury_index_artifact
+
+
+class Command(BaseCommand):
+    help = 'Compiles the injury TF-IDF index into a memory-mappable on-disk artifact shared by all workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Artifact directory (defaults to INJURY_INDEX_ARTIFACT_DIR)',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output'] or getattr(settings, 'INJURY_INDEX_ARTIFACT_DIR', None)
+        if not output:
+            raise CommandError('No artifact directory. Set INJURY_INDEX_ARTIFACT_DIR or pass --output.')
+
+        index = build_injury_index()
+        build_dir = write_injury_index_artifact(index, directory=output)
+        if build_dir is None:
+            self.stdout.write(self.style.WARNING('No active injuries with symptoms found; nothing compiled.'))
+            return
+
+        # Running workers pick up the new artifact on their next injury check
+        invalidate_injury_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'Injury index compiled: {len(index)} injuries, '
+            f'{len(index.vectorizer.vocabulary_)} terms -> {build_dir}'
+        ))
@@ -0,0 +1,105 @@
+import os
+import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from api.precompute import complete_profiles, store_precomputed_payloads
+from api.views import FitnessPlanView, NutritionSummaryView, PersonalizedMealPlanView
+
+
+def _init_worker():
+    # Spawned workers start without Django; forked ones must not reuse the
+    # parent's database connections
+    django.setup()
+    connections.close_all()
+
+
+def precompute_chunk(user_ids, today_iso):
+    """
+    Computes and stores the weekly fitness plan, nutrition summary and meal plan
+    for the users in one chunk. Returns (profiles processed, payloads stored, errors).
+    """
+    today = datetime.date.fromisoformat(today_iso)
+    week_end = today + timedelta(days=7 - today.isoweekday())
+
+    # kind -> (builder, valid until); a builder may return None for nothing to store
+    builders = {
+        'fitness_plan': (lambda profile: FitnessPlanView.get_weekly_plan(profile, today), week_end),
+        'nutrition_summary': (NutritionSummaryView.build_summary, today),
+        'meal_plan': (PersonalizedMealPlanView.build_meal_plan, today),
+    }
+
+    rows, errors = [], []
+    profiles = list(complete_profiles().filter(user_id__in=user_ids))
+    for profile in profiles:
+        # Each kind on its own, so one failing doesn't drop the user's others
+        for kind, (build, valid_until) in builders.items():
+            try:
+                payload = build(profile)
+            except Exception as e:
+                errors.append(f'user {profile.user_id} {kind}: {e}')
+                continue
+            if payload is not None:
+                rows.append((profile, kind, payload, valid_until))
+
+    stored = store_precomputed_payloads(rows)
+    connections.close_all()
+    return len(profiles), stored, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Precomputes weekly fitness plans, nutrition summaries and meal plans for every '
+        'user with a complete profile, in user-id chunks across a process pool'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Users per work unit (default: 500)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Worker processes; 1 runs everything in this process (default: CPU count)',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size, workers = options['chunk_size'], options['workers']
+        if chunk_size < 1 or workers < 1:
+            raise CommandError('--chunk-size and --workers must be at least 1.')
+
+        today_iso = timezone.localdate().isoformat()
+        user_ids = list(complete_profiles().order_by('user_id').values_list('user_id', flat=True))
+        chunks = [user_ids[i:i + chunk_size] for i in range(0, len(user_ids), chunk_size)]
+        if not chunks:
+            self.stdout.write(self.style.WARNING('No users with a complete profile; nothing precomputed.'))
+            return
+
+        results = []
+        if workers == 1 or len(chunks) == 1:
+            results = [precompute_chunk(chunk, today_iso) for chunk in chunks]
+        else:
+            # Workers must open their own connections, not inherit ours
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker) as executor:
+                futures = [executor.submit(precompute_chunk, chunk, today_iso) for chunk in chunks]
+                for future in as_completed(futures):
+                    results.append(future.result())
+
+        profiles = sum(result[0] for result in results)
+        stored = sum(result[1] for result in results)
+        errors = [error for result in results for error in result[2]]
+        for error in errors:
+            self.stdout.write(self.style.ERROR(f'  - {error}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Precomputed {stored} payloads for {profiles} users in {len(chunks)} chunks ({len(errors)} errors).'
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Activity, User
+from api.rollups import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds the UserDailyStats rollup rows from the logged activities and sets, '
+        'for one user or for every user with activities'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=str,
+            default=None,
+            help='Username to rebuild (default: every user with activities)',
+        )
+
+    def handle(self, *args, **options):
+        if options['user']:
+            try:
+                user_ids = [User.objects.get(username=options['user']).id]
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["user"]}" does not exist.')
+        else:
+            user_ids = list(Activity.objects.order_by().values_list('user_id', flat=True).distinct())
+
+        total_rows = 0
+        for user_id in user_ids:
+            total_rows += rebuild_daily_stats(user_id)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total_rows} daily stats rows for {len(user_ids)} user(s).'))
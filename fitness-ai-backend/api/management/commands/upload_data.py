@@ -8,6 +8,10 @@ from api.models import (
     FitnessActivity, Achievement, CompetitionCategory,
     CompetitionType, PlanPhase, PlanItem
 )
+from api.catalog import invalidate_catalog_snapshot
+from api.injury_index import (
+    build_injury_index, invalidate_injury_index, sync_injury_body_parts, write_injury_index_artifact
+)
 
 class Command(BaseCommand):
     help = 'Uploads data from JSON files to the database'
@@ -138,6 +142,12 @@ class Command(BaseCommand):
                     }
                 )
                 if created: created_count += 1
+
+        # Rebuild the body-part lookup table and the compiled injury index;
+        # workers reload it on their next injury check
+        sync_injury_body_parts(Injury.objects.all())
+        write_injury_index_artifact(build_injury_index())
+        invalidate_injury_index()
         self.stdout.write(self.style.SUCCESS(f'Injury data uploaded. Created: {created_count} items.'))
 
 
@@ -232,6 +242,8 @@ class Command(BaseCommand):
             f'Training data uploaded. Categories: {categories_created}, '
             f'Workouts: {workouts_created}, Exercises: {exercises_created}.'
         ))
+        # Workers rebuild their catalog snapshot on the next plan request
+        invalidate_catalog_snapshot()
         self.stdout.write(self.style.SUCCESS(
             f'Synced {activities_synced} items to FitnessActivity library.'
         ))
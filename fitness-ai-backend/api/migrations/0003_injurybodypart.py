@@ -0,0 +1,111 @@
+# Generated by Django 3.2.25 on 2026-10-17 04:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+import re
+
+# Frozen copy of api.body_parts as of this migration, so later changes to the
+# synonym tables can't change what the backfill writes
+
+# Canonical body part -> words users commonly type for it
+BODY_PART_SYNONYMS = {
+    'knee': ['knees', 'patella', 'kneecap', 'knee cap', 'meniscus', 'acl', 'mcl'],
+    'lower back': ['lumbar', 'lumbar spine', 'low back', 'lower spine', 'lumbago'],
+    'back': ['spine', 'upper back', 'mid back', 'thoracic', 'thoracic spine'],
+    'neck': ['cervical', 'cervical spine', 'nape'],
+    'shoulder': ['shoulders', 'rotator cuff', 'deltoid', 'deltoids', 'delts'],
+    'elbow': ['elbows', 'forearm', 'forearms'],
+    'wrist': ['wrists', 'carpal'],
+    'hip': ['hips', 'pelvis', 'hip flexor', 'hip flexors', 'glute', 'glutes'],
+    'groin': ['adductor', 'adductors', 'inner thigh'],
+    'hamstring': ['hamstrings', 'back of thigh', 'back of the thigh'],
+    'outer thigh': ['it band', 'itb', 'iliotibial band'],
+    'thigh': ['thighs', 'quad', 'quads', 'quadriceps'],
+    'shin': ['shins', 'tibia', 'lower leg'],
+    'ankle': ['ankles', 'talus'],
+    'achilles tendon': ['achilles', 'heel cord'],
+    'foot': ['feet', 'heel', 'heels', 'arch', 'sole', 'plantar', 'toe', 'toes'],
+    'chest': ['pec', 'pecs', 'pectoral', 'pectorals', 'ribs', 'rib cage', 'sternum'],
+    'head': ['skull', 'forehead', 'temple'],
+    'bones': ['bone', 'skeleton'],
+    'skin': ['scrape', 'blister'],
+    'muscle group': ['muscle', 'muscles'],
+    'soft tissue': ['tissue', 'ligament', 'ligaments'],
+}
+
+# Broader parts an injury should also be found under, e.g. a lower back
+# injury is a back injury too
+BODY_PART_PARENTS = {
+    'lower back': ['back'],
+    'outer thigh': ['thigh'],
+    'hamstring': ['thigh'],
+    'achilles tendon': ['ankle'],
+}
+
+# Qualifiers that don't change which part is meant
+IGNORED_WORDS = {'any', 'my', 'the', 'left', 'right', 'both', 'side', 'area', 'region'}
+
+SYNONYM_TO_PART = {part: part for part in BODY_PART_SYNONYMS}
+for _part, _synonyms in BODY_PART_SYNONYMS.items():
+    for _synonym in _synonyms:
+        SYNONYM_TO_PART[_synonym] = _part
+
+_PHRASE_SEPARATORS = re.compile(r',|/|&|;|\bor\b|\band\b')
+
+
+def _normalize(text):
+    words = re.sub(r'[^a-z0-9 ]+', ' ', text.lower()).split()
+    return ' '.join(word for word in words if word not in IGNORED_WORDS)
+
+
+def canonical_part(phrase):
+    if phrase in SYNONYM_TO_PART:
+        return SYNONYM_TO_PART[phrase]
+    if phrase.endswith('s') and phrase[:-1] in SYNONYM_TO_PART:
+        return SYNONYM_TO_PART[phrase[:-1]]
+    return phrase
+
+
+def injury_tokens(affected_part):
+    tokens = set()
+    for phrase in _PHRASE_SEPARATORS.split(affected_part.lower()):
+        phrase = _normalize(phrase)
+        if phrase:
+            part = canonical_part(phrase)
+            tokens.add(part)
+            tokens.update(BODY_PART_PARENTS.get(part, []))
+    return tokens
+
+
+def populate_body_part_tokens(apps, schema_editor):
+    Injury = apps.get_model('api', 'Injury')
+    InjuryBodyPart = apps.get_model('api', 'InjuryBodyPart')
+    InjuryBodyPart.objects.bulk_create([
+        InjuryBodyPart(injury_id=injury_id, token=token)
+        for injury_id, affected_part in Injury.objects.values_list('id', 'affected_part')
+        for token in injury_tokens(affected_part)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_workout_imageurl'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InjuryBodyPart',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(db_index=True, max_length=100)),
+                ('injury', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='body_part_tokens', to='api.injury')),
+            ],
+            options={
+                'verbose_name': 'Injury Body Part',
+                'verbose_name_plural': 'Injury Body Parts',
+                'unique_together': {('injury', 'token')},
+            },
+        ),
+        migrations.RunPython(populate_body_part_tokens, migrations.RunPython.noop),
+    ]
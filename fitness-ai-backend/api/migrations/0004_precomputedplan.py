@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-17 04:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_injurybodypart'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrecomputedPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('fitness_plan', 'Weekly Fitness Plan'), ('nutrition_summary', 'Nutrition Summary'), ('meal_plan', 'Meal Plan')], max_length=20)),
+                ('payload', models.JSONField()),
+                ('valid_until', models.DateField()),
+                ('profile_updated_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='precomputed_plans', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Precomputed Plan',
+                'verbose_name_plural': 'Precomputed Plans',
+                'unique_together': {('user', 'kind')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-17 04:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_precomputedplan'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='setlog',
+            options={'ordering': ['created_at', 'id'], 'verbose_name': 'Set Log', 'verbose_name_plural': 'Set Logs'},
+        ),
+    ]
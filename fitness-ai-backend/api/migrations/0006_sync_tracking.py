@@ -0,0 +1,65 @@
+# Generated by Django 3.2.25 on 2026-10-17 04:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_setlog_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(choices=[('activity', 'Activity'), ('setlog', 'Set Log'), ('healthdatalog', 'Health Data Log')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Deleted Record',
+                'verbose_name_plural': 'Deleted Records',
+            },
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='healthdatalog',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='setlog',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='activity_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='healthdatalog',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='healthlog_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='setlog',
+            index=models.Index(fields=['updated_at', 'id'], name='setlog_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='deletedrecord',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deleted_records', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='deletedrecord',
+            index=models.Index(fields=['user', 'deleted_at', 'id'], name='deletedrecord_user_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-17 04:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_sync_tracking'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['user', 'date', 'timestamp', 'id'], name='activity_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='food',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['type', 'protein_per_100g'], name='food_active_type_protein_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='healthdatalog',
+            index=models.Index(fields=['user', 'timestamp'], name='healthlog_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='setlog',
+            index=models.Index(fields=['activity', 'exercise_name', 'weight_kg'], name='setlog_activity_exercise_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 3.2.25 on 2026-10-17 04:54
+
+from django.db import migrations, models
+from django.db.models import Count, F, Max, Q, Sum
+
+
+def backfill_set_aggregates(apps, schema_editor):
+    Activity = apps.get_model('api', 'Activity')
+    SetLog = apps.get_model('api', 'SetLog')
+    rows = SetLog.objects.order_by().values('activity_id').annotate(
+        total_volume=Sum(F('weight_kg') * F('reps'), filter=Q(weight_kg__isnull=False, reps__isnull=False)),
+        set_count=Count('id'),
+        max_weight_kg=Max('weight_kg'),
+        total_distance_km=Sum('distance_km'),
+    )
+    activities = [
+        Activity(
+            id=row['activity_id'],
+            total_volume=row['total_volume'] or 0,
+            set_count=row['set_count'],
+            max_weight_kg=row['max_weight_kg'],
+            total_distance_km=row['total_distance_km'] or 0,
+        )
+        for row in rows.iterator()
+    ]
+    Activity.objects.bulk_update(
+        activities, ['total_volume', 'set_count', 'max_weight_kg', 'total_distance_km'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='max_weight_kg',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='set_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='total_distance_km',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='total_volume',
+            field=models.FloatField(default=0, help_text='Sum of weight_kg * reps over all sets'),
+        ),
+        migrations.RunPython(backfill_set_aggregates, migrations.RunPython.noop),
+    ]
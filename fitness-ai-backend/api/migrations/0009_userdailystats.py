@@ -0,0 +1,72 @@
+# Generated by Django 3.2.25 on 2026-10-17 04:56
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum, Value
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def backfill_daily_stats(apps, schema_editor):
+    # Frozen copy of the aggregation in api.rollups as of this migration, so
+    # later changes to the app code can't change what the backfill writes
+    Activity = apps.get_model('api', 'Activity')
+    SetLog = apps.get_model('api', 'SetLog')
+    UserDailyStats = apps.get_model('api', 'UserDailyStats')
+
+    buckets = {}
+    activity_rows = Activity.objects.order_by().values(
+        'user_id', 'date', category=Coalesce('fitness_activity__category', Value(''))
+    ).annotate(
+        workouts=Count('id'), duration=Sum('duration'), volume=Sum('total_volume'), set_total=Sum('set_count')
+    )
+    for row in activity_rows:
+        buckets[(row['user_id'], row['date'], row['category'])] = UserDailyStats(
+            user_id=row['user_id'], date=row['date'], category=row['category'],
+            workout_count=row['workouts'], total_duration=row['duration'] or 0,
+            total_volume=round(row['volume'] or 0, 2), set_count=row['set_total'] or 0,
+        )
+
+    set_rows = SetLog.objects.order_by().values(
+        'activity__user_id', 'activity__date', 'exercise_name',
+        category=Coalesce('activity__fitness_activity__category', Value('')),
+    ).annotate(sets=Count('id'), weighted_sets=Count('weight_kg'), max_weight=Max('weight_kg'))
+    for row in set_rows:
+        bucket = buckets.get((row['activity__user_id'], row['activity__date'], row['category']))
+        if bucket is not None:
+            bucket.exercise_stats[row['exercise_name']] = {
+                'sets': row['sets'], 'weighted_sets': row['weighted_sets'], 'max_weight': row['max_weight'],
+            }
+
+    UserDailyStats.objects.bulk_create(buckets.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_activity_set_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('category', models.CharField(blank=True, help_text='FitnessActivity category; empty for unlinked activities', max_length=20)),
+                ('workout_count', models.PositiveIntegerField(default=0)),
+                ('total_duration', models.PositiveIntegerField(default=0, help_text='Duration in minutes')),
+                ('total_volume', models.FloatField(default=0)),
+                ('set_count', models.PositiveIntegerField(default=0)),
+                ('exercise_stats', models.JSONField(default=dict)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Daily Stats',
+                'verbose_name_plural': 'User Daily Stats',
+                'ordering': ['date', 'category'],
+                'unique_together': {('user', 'date', 'category')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
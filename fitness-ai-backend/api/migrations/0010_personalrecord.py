@@ -0,0 +1,110 @@
+# Generated by Django 3.2.25 on 2026-10-17 05:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from collections import defaultdict
+from itertools import groupby
+
+
+# Frozen copy of the record rules in api.records as of this migration, so
+# later changes to the app code can't change what the backfill writes
+BRZYCKI_MAX_REPS = 10
+RECORD_PARTS = (
+    (('max_weight_kg', 'max_weight_reps'), 'max_weight_date'),
+    (('estimated_1rm_kg',), 'estimated_1rm_date'),
+    (('best_volume_kg',), 'best_volume_date'),
+)
+
+
+def estimate_1rm(weight, reps):
+    if not reps:
+        return None
+    if reps == 1:
+        return weight
+    if reps <= BRZYCKI_MAX_REPS:
+        return round(weight * 36 / (37 - reps), 2)
+    return round(weight * (1 + reps / 30), 2)
+
+
+def _rank(values, fields, date_field):
+    day = values.get(date_field)
+    if day is None:
+        return None
+    return tuple(values.get(field) or 0 for field in fields) + (-day.toordinal(),)
+
+
+def merge_best(best, candidate):
+    for fields, date_field in RECORD_PARTS:
+        new_rank = _rank(candidate, fields, date_field)
+        if new_rank is None:
+            continue
+        current_rank = _rank(best, fields, date_field)
+        if current_rank is None or new_rank > current_rank:
+            for field in fields + (date_field,):
+                best[field] = candidate.get(field)
+
+
+def best_by_exercise(rows):
+    bests = defaultdict(dict)
+    volumes, volume_dates = defaultdict(float), {}
+    for exercise_name, activity_id, day, weight, reps in rows:
+        merge_best(bests[exercise_name], {
+            'max_weight_kg': weight, 'max_weight_reps': reps, 'max_weight_date': day,
+            'estimated_1rm_kg': estimate_1rm(weight, reps), 'estimated_1rm_date': day if reps else None,
+        })
+        if reps:
+            volumes[(exercise_name, activity_id)] += weight * reps
+            volume_dates[(exercise_name, activity_id)] = day
+    for (exercise_name, activity_id), volume in volumes.items():
+        merge_best(bests[exercise_name], {
+            'best_volume_kg': round(volume, 2), 'best_volume_date': volume_dates[(exercise_name, activity_id)],
+        })
+    return bests
+
+
+def backfill_personal_records(apps, schema_editor):
+    SetLog = apps.get_model('api', 'SetLog')
+    PersonalRecord = apps.get_model('api', 'PersonalRecord')
+    rows = SetLog.objects.filter(weight_kg__isnull=False).order_by('activity__user_id').values_list(
+        'activity__user_id', 'exercise_name', 'activity_id', 'activity__date', 'weight_kg', 'reps'
+    )
+    for user_id, user_rows in groupby(rows.iterator(), key=lambda row: row[0]):
+        bests = best_by_exercise(row[1:] for row in user_rows)
+        PersonalRecord.objects.bulk_create([
+            PersonalRecord(user_id=user_id, exercise_name=exercise_name, **best)
+            for exercise_name, best in bests.items()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_userdailystats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonalRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exercise_name', models.CharField(max_length=100)),
+                ('max_weight_kg', models.FloatField()),
+                ('max_weight_reps', models.PositiveIntegerField(blank=True, help_text='Most reps done at the max weight', null=True)),
+                ('max_weight_date', models.DateField()),
+                ('estimated_1rm_kg', models.FloatField(blank=True, null=True)),
+                ('estimated_1rm_date', models.DateField(blank=True, null=True)),
+                ('best_volume_kg', models.FloatField(default=0, help_text='Highest weight x reps total for this exercise in one activity')),
+                ('best_volume_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='personal_records', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Personal Record',
+                'verbose_name_plural': 'Personal Records',
+                'ordering': ['exercise_name'],
+                'unique_together': {('user', 'exercise_name')},
+            },
+        ),
+        migrations.RunPython(backfill_personal_records, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-17 05:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_personalrecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('version', models.BigIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Dataset Version',
+                'verbose_name_plural': 'Dataset Versions',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-17 05:37
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_datasetversion'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='setlog',
+            name='setlog_updated_idx',
+        ),
+        migrations.RemoveField(
+            model_name='setlog',
+            name='updated_at',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 05:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_setlog_drop_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='deletedrecord',
+            name='model_name',
+            field=models.CharField(choices=[('activity', 'Activity'), ('setlog', 'Set Log')], max_length=20),
+        ),
+    ]
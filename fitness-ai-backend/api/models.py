@@ -145,14 +145,51 @@ class Activity(models.Model):
     timestamp = models.DateTimeField(default=timezone.now)
     duration = models.PositiveIntegerField(null=True, blank=True, help_text="Duration in minutes", validators=[MaxValueValidator(1440)])
     notes = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Aggregates over this activity's sets, kept in sync by every write path
+    # that changes the sets (see update_set_aggregates)
+    total_volume = models.FloatField(default=0, help_text="Sum of weight_kg * reps over all sets")
+    set_count = models.PositiveIntegerField(default=0)
+    max_weight_kg = models.FloatField(null=True, blank=True)
+    total_distance_km = models.FloatField(default=0)
 
     def __str__(self):
         return f'{self.name} on {self.date} by {self.user.username}'
 
+    def update_set_aggregates(self, sets):
+        """
+        Recomputes the stored aggregates from the activity's complete list of sets,
+        given as SetLog objects or dicts of SetLog fields. Doesn't save.
+        """
+        def value(set_log, field):
+            return set_log.get(field) if isinstance(set_log, dict) else getattr(set_log, field)
+
+        total_volume, set_count, max_weight, total_distance = 0.0, 0, None, 0.0
+        for set_log in sets:
+            weight, reps, distance = value(set_log, 'weight_kg'), value(set_log, 'reps'), value(set_log, 'distance_km')
+            set_count += 1
+            if weight is not None:
+                max_weight = weight if max_weight is None else max(max_weight, weight)
+                if reps is not None:
+                    total_volume += weight * reps
+            if distance is not None:
+                total_distance += distance
+
+        self.total_volume = total_volume
+        self.set_count = set_count
+        self.max_weight_kg = max_weight
+        self.total_distance_km = total_distance
+
     class Meta:
         verbose_name = "Activity"
         verbose_name_plural = "Activities"
         ordering = ['-date', '-timestamp']
+        indexes = [
+            # Date-range views per user; also serves the keyset list order
+            models.Index(fields=['user', 'date', 'timestamp', 'id'], name='activity_user_date_idx'),
+            models.Index(fields=['user', 'updated_at', 'id'], name='activity_user_updated_idx'),
+        ]
 
 #-------------------------------------------------------------------------------
 
@@ -172,7 +209,66 @@ class SetLog(models.Model):
     class Meta:
         verbose_name = "Set Log"
         verbose_name_plural = "Set Logs"
-        ordering = ['created_at']
+        # id breaks ties between sets bulk-inserted with the same created_at
+        ordering = ['created_at', 'id']
+        indexes = [
+            # Per-exercise progress within a user's activities, covering weight_kg
+            models.Index(fields=['activity', 'exercise_name', 'weight_kg'], name='setlog_activity_exercise_idx'),
+        ]
+
+#-------------------------------------------------------------------------------
+
+class UserDailyStats(models.Model):
+    """
+    Daily training rollup per user and activity category, maintained on every
+    activity write (see rollups.py) so dashboards read one row per day and
+    category instead of scanning activities and sets.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    category = models.CharField(max_length=20, blank=True, help_text="FitnessActivity category; empty for unlinked activities")
+    workout_count = models.PositiveIntegerField(default=0)
+    total_duration = models.PositiveIntegerField(default=0, help_text="Duration in minutes")
+    total_volume = models.FloatField(default=0)
+    set_count = models.PositiveIntegerField(default=0)
+    # exercise name -> {"sets": ..., "weighted_sets": ..., "max_weight": ...}
+    exercise_stats = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f"{self.user.username} {self.date} {self.category or 'Other'}: {self.workout_count} workouts"
+
+    class Meta:
+        verbose_name = "User Daily Stats"
+        verbose_name_plural = "User Daily Stats"
+        unique_together = ('user', 'date', 'category')
+        ordering = ['date', 'category']
+
+#-------------------------------------------------------------------------------
+
+class PersonalRecord(models.Model):
+    """
+    A user's best results for one exercise, kept current on every set write
+    (see records.py) so records are read without scanning the set history.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='personal_records')
+    exercise_name = models.CharField(max_length=100)
+    max_weight_kg = models.FloatField()
+    max_weight_reps = models.PositiveIntegerField(null=True, blank=True, help_text="Most reps done at the max weight")
+    max_weight_date = models.DateField()
+    estimated_1rm_kg = models.FloatField(null=True, blank=True)
+    estimated_1rm_date = models.DateField(null=True, blank=True)
+    best_volume_kg = models.FloatField(default=0, help_text="Highest weight x reps total for this exercise in one activity")
+    best_volume_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.exercise_name}: {self.max_weight_kg} kg"
+
+    class Meta:
+        verbose_name = "Personal Record"
+        verbose_name_plural = "Personal Records"
+        unique_together = ('user', 'exercise_name')
+        ordering = ['exercise_name']
 
 #-------------------------------------------------------------------------------
 
@@ -197,6 +293,10 @@ class Food(models.Model):
         verbose_name = "Food Item"
         verbose_name_plural = "Food Items"
         ordering = ['name']
+        indexes = [
+            # Partial on is_active: a bare boolean predicate can't seek an index column on SQLite
+            models.Index(fields=['type', 'protein_per_100g'], condition=models.Q(is_active=True), name='food_active_type_protein_idx'),
+        ]
 
 #-------------------------------------------------------------------------------
 
@@ -222,6 +322,23 @@ class Injury(models.Model):
         ordering = ['name']
         unique_together = ('name', 'affected_part', 'severity')
 
+
+class InjuryBodyPart(models.Model):
+    """
+    Inverted index row mapping a normalized body-part token (see body_parts.py)
+    to an injury, so candidate injuries are found by exact token lookup.
+    """
+    injury = models.ForeignKey(Injury, on_delete=models.CASCADE, related_name='body_part_tokens')
+    token = models.CharField(max_length=100, db_index=True)
+
+    def __str__(self):
+        return f"{self.token} -> {self.injury.name}"
+
+    class Meta:
+        verbose_name = "Injury Body Part"
+        verbose_name_plural = "Injury Body Parts"
+        unique_together = ('injury', 'token')
+
 #-------------------------------------------------------------------------------
 
 class TrainingCategory(models.Model):
@@ -423,8 +540,86 @@ class HealthDataLog(models.Model):
     spo2 = models.FloatField(null=True, blank=True, help_text="Blood Oxygen Saturation (%)")
     stress_level = models.PositiveIntegerField(null=True, blank=True, help_text="A score representing stress, e.g., 1-100")
     steps_today = models.PositiveIntegerField(null=True, blank=True, help_text="Cumulative steps for the day of the reading")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Health Data Log"
         verbose_name_plural = "Health Data Logs"
-        ordering = ['-timestamp']
\ No newline at end of file
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['user', 'timestamp'], name='healthlog_user_time_idx'),
+            models.Index(fields=['user', 'updated_at', 'id'], name='healthlog_user_updated_idx'),
+        ]
+#-------------------------------------------------------------------------------
+
+class DeletedRecord(models.Model):
+    """
+    Tombstone for a deleted Activity or SetLog, so the sync endpoint can tell
+    offline clients what to remove. Deleting an activity records only the
+    activity; its sets are implied. Health logs are append-only and need none.
+    """
+    MODEL_CHOICES = [
+        ('activity', 'Activity'),
+        ('setlog', 'Set Log'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='deleted_records')
+    model_name = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.model_name} #{self.object_id} deleted at {self.deleted_at}"
+
+    class Meta:
+        verbose_name = "Deleted Record"
+        verbose_name_plural = "Deleted Records"
+        indexes = [
+            models.Index(fields=['user', 'deleted_at', 'id'], name='deletedrecord_user_idx'),
+        ]
+
+#-------------------------------------------------------------------------------
+
+class PrecomputedPlan(models.Model):
+    """
+    A plan response computed ahead of time by the precompute_plans command, so
+    the plan endpoints can serve it without recomputing. A row is only served
+    while valid_until hasn't passed and the profile is unchanged since.
+    """
+    KIND_CHOICES = [
+        ('fitness_plan', 'Weekly Fitness Plan'),
+        ('nutrition_summary', 'Nutrition Summary'),
+        ('meal_plan', 'Meal Plan'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='precomputed_plans')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    payload = models.JSONField()
+    valid_until = models.DateField()
+    profile_updated_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.kind} (until {self.valid_until})"
+
+    class Meta:
+        verbose_name = "Precomputed Plan"
+        verbose_name_plural = "Precomputed Plans"
+        unique_together = ('user', 'kind')
+
+#-------------------------------------------------------------------------------
+
+class DatasetVersion(models.Model):
+    """
+    Current version of a named dataset (see dataset_versions.py). Kept in the
+    database so every process, including management commands, sees a bump.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+    class Meta:
+        verbose_name = "Dataset Version"
+        verbose_name_plural = "Dataset Versions"
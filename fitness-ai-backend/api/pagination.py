@@ -0,0 +1,97 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class ActivityKeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination for activities, newest first by (date, timestamp, id).
+    Each page is one indexed range query plus the prefetch of its sets: no
+    COUNT(*) and no OFFSET, so page 500 costs the same as page 1. The response
+    keeps the 'results' key of the default pagination, with an opaque 'next' link
+    instead of page numbers.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by('-date', '-timestamp', '-id')
+        if position is not None:
+            date, timestamp, activity_id = position
+            queryset = queryset.filter(
+                Q(date__lt=date)
+                | Q(date=date, timestamp__lt=timestamp)
+                | Q(date=date, timestamp=timestamp, id__lt=activity_id)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return api_settings.PAGE_SIZE
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            date, timestamp, activity_id = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            position = (parse_date(date), parse_datetime(timestamp), int(activity_id))
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, activity):
+        position = [activity.date.isoformat(), activity.timestamp.isoformat(), activity.id]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+def wants_keyset_pagination(request):
+    """?pagination=cursor starts keyset paging; the 'next' links carry ?cursor=."""
+    params = request.query_params
+    return params.get('pagination') == 'cursor' or ActivityKeysetPagination.cursor_query_param in params
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+import numpy as np
+from django.utils import timezone
+
+from .models import Activity
+
+# How far back logged workouts influence the plan
+HISTORY_DAYS = 28
+# Days after which a workout's contribution to muscle load / repetition halves
+RECENCY_HALF_LIFE_DAYS = 3.0
+
+# Score weights
+NEGLECT_WEIGHT = 1.0     # reward for muscle groups not trained in the window
+FATIGUE_WEIGHT = 1.5     # penalty for muscle groups trained recently
+REPEAT_WEIGHT = 1.0      # penalty for the exact activity done recently
+FREQUENCY_WEIGHT = 0.5   # penalty for activities done often in the window
+JITTER_WEIGHT = 0.25     # random spread so equal scores don't always pick the same rows
+
+
+class TrainingHistory:
+    """
+    A user's recent logged workouts as flat arrays, one entry per Activity
+    linked to the catalog: FitnessActivity id, days ago and number of sets.
+    """
+
+    def __init__(self, fitness_activity_ids, days_ago, set_counts):
+        self.fitness_activity_ids = np.asarray(fitness_activity_ids, dtype=np.int64)
+        self.days_ago = np.asarray(days_ago, dtype=np.float64)
+        self.set_counts = np.asarray(set_counts, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.fitness_activity_ids)
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], [])
+
+    @classmethod
+    def for_user(cls, user_id, today=None, days=HISTORY_DAYS):
+        """Loads the last `days` days of linked activities with one query."""
+        today = today or timezone.localdate()
+        rows = Activity.objects.filter(
+            user_id=user_id,
+            date__gte=today - timedelta(days=days),
+            date__lte=today,
+            fitness_activity__isnull=False,
+        ).order_by().values_list('fitness_activity_id', 'date', 'set_count')
+
+        fitness_activity_ids, days_ago, set_counts = [], [], []
+        for fitness_activity_id, activity_date, set_count in rows:
+            fitness_activity_ids.append(fitness_activity_id)
+            days_ago.append((today - activity_date).days)
+            set_counts.append(set_count)
+        return cls(fitness_activity_ids, days_ago, set_counts)
+
+
+def score_catalog(catalog, history, rng=None):
+    """
+    Scores every activity in the catalog snapshot for a user in one NumPy pass.
+    Activities hitting muscle groups the user hasn't trained in the window
+    score higher; activities loading recently trained groups, or repeating a
+    recent or frequent activity, score lower. Returns one score per catalog row.
+    """
+    n_activities, n_groups = catalog.muscle_matrix.shape
+    rng = rng or np.random.default_rng()
+    scores = JITTER_WEIGHT * rng.random(n_activities)
+    if not n_activities:
+        return scores
+
+    rows = catalog.rows_for_ids(history.fitness_activity_ids)
+    logged = rows >= 0
+    rows, days_ago, set_counts = rows[logged], history.days_ago[logged], history.set_counts[logged]
+    decay = 0.5 ** (days_ago / RECENCY_HALF_LIFE_DAYS)
+
+    # Muscle-group load: decayed, set-weighted sum of each logged activity's groups
+    session_weight = decay * np.sqrt(np.maximum(set_counts, 1.0))
+    group_load = session_weight @ catalog.muscle_matrix[rows] if len(rows) else np.zeros(n_groups)
+    if group_load.max(initial=0.0) > 0:
+        group_load = group_load / group_load.max()
+    neglected = (group_load == 0).astype(np.float32)
+
+    # Share of each activity's muscle groups that are fatigued / neglected
+    fatigue = catalog.muscle_matrix @ group_load
+    neglect = catalog.muscle_matrix @ neglected
+
+    # Per-activity repetition: most recent decay and how often it was done
+    repeat = np.zeros(n_activities)
+    np.maximum.at(repeat, rows, decay)
+    frequency = np.bincount(rows, minlength=n_activities).astype(np.float64)
+    frequency /= max(frequency.max(initial=0.0), 1.0)
+
+    scores += (
+        NEGLECT_WEIGHT * neglect
+        - FATIGUE_WEIGHT * fatigue
+        - REPEAT_WEIGHT * repeat
+        - FREQUENCY_WEIGHT * frequency
+    )
+    return scores
+
+
+def top_activities(catalog, scores, category, count, min_difficulty=1, max_difficulty=10):
+    """The `count` best-scoring catalog activities in a category and difficulty range."""
+    candidates = np.flatnonzero(catalog.category_mask(category, min_difficulty, max_difficulty))
+    if len(candidates) > count:
+        best = np.argpartition(-scores[candidates], count - 1)[:count]
+        candidates = candidates[best]
+    candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+    return [catalog.activities[row] for row in candidates]
@@ -0,0 +1,53 @@
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Profile, PrecomputedPlan
+
+logger = logging.getLogger(__name__)
+
+
+def complete_profiles():
+    """Profiles with everything the nutrition and meal plan endpoints need."""
+    return Profile.objects.filter(
+        weight__isnull=False, height__isnull=False, age__isnull=False,
+    ).exclude(gender='')
+
+
+def get_precomputed_payload(profile, kind, today=None):
+    """
+    The precomputed payload of `kind` for the profile's user, or None if there
+    is none, it has expired, or the profile changed after it was computed.
+    """
+    today = today or timezone.localdate()
+    return PrecomputedPlan.objects.filter(
+        user_id=profile.user_id,
+        kind=kind,
+        valid_until__gte=today,
+        profile_updated_at=profile.updated_at,
+    ).values_list('payload', flat=True).first()
+
+
+def store_precomputed_payloads(rows):
+    """
+    Replaces the stored payloads for the given rows, each a
+    (profile, kind, payload, valid_until) tuple, in one transaction.
+    """
+    if not rows:
+        return 0
+    user_ids = {profile.user_id for profile, _, _, _ in rows}
+    kinds = {kind for _, kind, _, _ in rows}
+    with transaction.atomic():
+        PrecomputedPlan.objects.filter(user_id__in=user_ids, kind__in=kinds).delete()
+        PrecomputedPlan.objects.bulk_create([
+            PrecomputedPlan(
+                user_id=profile.user_id,
+                kind=kind,
+                payload=payload,
+                valid_until=valid_until,
+                profile_updated_at=profile.updated_at,
+            )
+            for profile, kind, payload, valid_until in rows
+        ])
+    return len(rows)
@@ -0,0 +1,139 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .locking import lock_user_training_data
+from .models import PersonalRecord, SetLog
+
+# Brzycki is the closer 1RM estimate at low reps, Epley above this
+BRZYCKI_MAX_REPS = 10
+
+# Each record part: the fields ranked in order, then the date it was set.
+# Equal results keep the earliest date.
+RECORD_PARTS = (
+    (('max_weight_kg', 'max_weight_reps'), 'max_weight_date'),
+    (('estimated_1rm_kg',), 'estimated_1rm_date'),
+    (('best_volume_kg',), 'best_volume_date'),
+)
+RECORD_FIELDS = tuple(field for fields, date_field in RECORD_PARTS for field in fields + (date_field,))
+
+
+def estimate_1rm(weight, reps):
+    """Estimated one-rep max in kg; None without reps."""
+    if not reps:
+        return None
+    if reps == 1:
+        return weight
+    if reps <= BRZYCKI_MAX_REPS:
+        return round(weight * 36 / (37 - reps), 2)
+    return round(weight * (1 + reps / 30), 2)
+
+
+def _rank(values, fields, date_field):
+    day = values.get(date_field)
+    if day is None:
+        return None
+    return tuple(values.get(field) or 0 for field in fields) + (-day.toordinal(),)
+
+
+def merge_best(best, candidate):
+    """
+    Copies every record part of `candidate` that beats the one in `best` into
+    `best` (both dicts of RECORD_FIELDS). Returns whether anything changed.
+    """
+    changed = False
+    for fields, date_field in RECORD_PARTS:
+        new_rank = _rank(candidate, fields, date_field)
+        if new_rank is None:
+            continue
+        current_rank = _rank(best, fields, date_field)
+        if current_rank is None or new_rank > current_rank:
+            for field in fields + (date_field,):
+                best[field] = candidate.get(field)
+            changed = True
+    return changed
+
+
+def best_by_exercise(rows):
+    """
+    Record fields per exercise from (exercise_name, activity_id, date, weight_kg,
+    reps) rows, in any order. Sets without a weight don't count. Migration 0010
+    backfills with its own frozen copy of these rules.
+    """
+    bests = defaultdict(dict)
+    volumes, volume_dates = defaultdict(float), {}
+    for exercise_name, activity_id, day, weight, reps in rows:
+        if weight is None:
+            continue
+        merge_best(bests[exercise_name], {
+            'max_weight_kg': weight, 'max_weight_reps': reps, 'max_weight_date': day,
+            'estimated_1rm_kg': estimate_1rm(weight, reps), 'estimated_1rm_date': day if reps else None,
+        })
+        if reps:
+            volumes[(exercise_name, activity_id)] += weight * reps
+            volume_dates[(exercise_name, activity_id)] = day
+    for (exercise_name, activity_id), volume in volumes.items():
+        merge_best(bests[exercise_name], {
+            'best_volume_kg': round(volume, 2), 'best_volume_date': volume_dates[(exercise_name, activity_id)],
+        })
+    return bests
+
+
+def record_new_sets(user_id, activities_with_sets):
+    """
+    Raises the user's records with the sets of newly created activities, given as
+    (activity, list of set data dicts) pairs. Only the records of the exercises
+    involved are read, in one query, so the cost doesn't depend on history size.
+    Concurrent writers for the same user wait for each other (see locking.py).
+    """
+    bests = best_by_exercise(
+        (set_data['exercise_name'], activity.pk, activity.date, set_data.get('weight_kg'), set_data.get('reps'))
+        for activity, sets_data in activities_with_sets
+        for set_data in sets_data
+    )
+    if not bests:
+        return
+
+    with transaction.atomic(savepoint=False):
+        # Without the lock, two first logs of an exercise would both insert it
+        lock_user_training_data(user_id)
+        now = timezone.now()
+        to_update = []
+        for record in PersonalRecord.objects.filter(user_id=user_id, exercise_name__in=list(bests)):
+            values = {field: getattr(record, field) for field in RECORD_FIELDS}
+            if merge_best(values, bests.pop(record.exercise_name)):
+                for field, value in values.items():
+                    setattr(record, field, value)
+                # bulk_update doesn't apply auto_now
+                record.updated_at = now
+                to_update.append(record)
+
+        if to_update:
+            PersonalRecord.objects.bulk_update(to_update, RECORD_FIELDS + ('updated_at',))
+        PersonalRecord.objects.bulk_create([
+            PersonalRecord(user_id=user_id, exercise_name=exercise_name, **best)
+            for exercise_name, best in bests.items()
+        ])
+
+
+def recompute_personal_records(user_id, exercise_names):
+    """
+    Rebuilds the user's records for the given exercises from their sets, for
+    edits and deletes that can lower a record. Exercises left without weighted
+    sets lose their record.
+    """
+    exercise_names = list(set(exercise_names))
+    if not exercise_names:
+        return
+    with transaction.atomic(savepoint=False):
+        lock_user_training_data(user_id)
+        rows = SetLog.objects.filter(activity__user_id=user_id, exercise_name__in=exercise_names).order_by().values_list(
+            'exercise_name', 'activity_id', 'activity__date', 'weight_kg', 'reps'
+        )
+        bests = best_by_exercise(rows.iterator())
+        PersonalRecord.objects.filter(user_id=user_id, exercise_name__in=exercise_names).delete()
+        PersonalRecord.objects.bulk_create([
+            PersonalRecord(user_id=user_id, exercise_name=exercise_name, **best)
+            for exercise_name, best in bests.items()
+        ])
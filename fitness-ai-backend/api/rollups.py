@@ -0,0 +1,82 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Max, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Activity, SetLog, UserDailyStats
+from .dashboard_cache import invalidate_dashboard
+from .locking import lock_user_training_data
+
+# Days refreshed per pair of grouped queries, to keep the IN lists short
+REFRESH_CHUNK_DAYS = 200
+
+
+def daily_stats_rows(activities, sets):
+    """
+    Unsaved daily stats rows for the given activity and set querysets, one per
+    (user, date, category), from two grouped queries. Migration 0009 backfills
+    with its own frozen copy of this.
+    """
+    buckets = {}
+    activity_rows = activities.order_by().values(
+        'user_id', 'date', category=Coalesce('fitness_activity__category', Value(''))
+    ).annotate(
+        workouts=Count('id'), duration=Sum('duration'), volume=Sum('total_volume'), set_total=Sum('set_count')
+    )
+    for row in activity_rows:
+        buckets[(row['user_id'], row['date'], row['category'])] = UserDailyStats(
+            user_id=row['user_id'], date=row['date'], category=row['category'],
+            workout_count=row['workouts'], total_duration=row['duration'] or 0,
+            total_volume=round(row['volume'] or 0, 2), set_count=row['set_total'] or 0,
+        )
+
+    set_rows = sets.order_by().values(
+        'activity__user_id', 'activity__date', 'exercise_name',
+        category=Coalesce('activity__fitness_activity__category', Value('')),
+    ).annotate(sets=Count('id'), weighted_sets=Count('weight_kg'), max_weight=Max('weight_kg'))
+    exercise_stats = defaultdict(dict)
+    for row in set_rows:
+        exercise_stats[(row['activity__user_id'], row['activity__date'], row['category'])][row['exercise_name']] = {
+            'sets': row['sets'], 'weighted_sets': row['weighted_sets'], 'max_weight': row['max_weight'],
+        }
+    for key, stats in exercise_stats.items():
+        if key in buckets:
+            buckets[key].exercise_stats = stats
+
+    return list(buckets.values())
+
+
+def refresh_daily_stats(user_id, dates):
+    """
+    Recomputes the user's rollup rows for the given days from their activities.
+    Call it inside the transaction that changed activities or sets on those days,
+    with both the old and new date when an activity moves. Concurrent refreshes
+    for the same user wait for each other (see locking.py). The user's cached
+    dashboard is invalidated once the transaction commits.
+    """
+    dates = sorted(set(dates))
+    with transaction.atomic(savepoint=False):
+        lock_user_training_data(user_id)
+        for start in range(0, len(dates), REFRESH_CHUNK_DAYS):
+            chunk = dates[start:start + REFRESH_CHUNK_DAYS]
+            UserDailyStats.objects.filter(user_id=user_id, date__in=chunk).delete()
+            UserDailyStats.objects.bulk_create(daily_stats_rows(
+                Activity.objects.filter(user_id=user_id, date__in=chunk),
+                SetLog.objects.filter(activity__user_id=user_id, activity__date__in=chunk),
+            ), batch_size=500)
+        transaction.on_commit(lambda: invalidate_dashboard(user_id))
+
+
+def rebuild_daily_stats(user_id):
+    """Replaces all of the user's rollup rows. Returns the number of rows written."""
+    with transaction.atomic():
+        lock_user_training_data(user_id)
+        UserDailyStats.objects.filter(user_id=user_id).delete()
+        rows = daily_stats_rows(
+            Activity.objects.filter(user_id=user_id),
+            SetLog.objects.filter(activity__user_id=user_id),
+        )
+        UserDailyStats.objects.bulk_create(rows, batch_size=500)
+        transaction.on_commit(lambda: invalidate_dashboard(user_id))
+    return len(rows)
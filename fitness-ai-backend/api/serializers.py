@@ -1,10 +1,16 @@
 # serializers.py
 from rest_framework import serializers
+from django.db import transaction
+from django.utils import timezone
+from .sync import record_deletions
+from .rollups import refresh_daily_stats
+from .records import record_new_sets, recompute_personal_records
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from .models import (
     User, Profile, Activity, SetLog, Food, Injury, 
-    Exercise, Workout, TrainingCategory, FitnessActivity, Achievement, UserAchievement, CompetitionCategory, CompetitionType, PlanPhase, PlanItem, HealthDataLog
+    Exercise, Workout, TrainingCategory, FitnessActivity, Achievement, UserAchievement, CompetitionCategory, CompetitionType, PlanPhase, PlanItem, HealthDataLog,
+    PersonalRecord
 )
 
 
@@ -126,9 +132,12 @@ class ProfileSerializer(serializers.ModelSerializer):
 
 
 class SetLogSerializer(serializers.ModelSerializer):
+    # Optional on write: lets an edit target an existing set instead of matching by position
+    id = serializers.IntegerField(required=False)
+
     class Meta:
         model = SetLog
-        fields = ['exercise_name', 'weight_kg', 'reps', 'distance_km', 'duration_minutes', 'rest_seconds']
+        fields = ['id', 'exercise_name', 'weight_kg', 'reps', 'distance_km', 'duration_minutes', 'rest_seconds']
 
 
     def validate_weight_kg(self, value):
@@ -168,43 +177,128 @@ class ActivitySerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Activity
-        fields = ('id', 'name', 'date', 'duration', 'notes', 'fitness_activity_id', 'category', 'sets')
+        fields = (
+            'id', 'name', 'date', 'duration', 'notes', 'fitness_activity_id', 'category', 'sets',
+            'total_volume', 'set_count', 'max_weight_kg', 'total_distance_km',
+        )
+        read_only_fields = ('total_volume', 'set_count', 'max_weight_kg', 'total_distance_km')
+
+    SET_FIELDS = ('exercise_name', 'weight_kg', 'reps', 'distance_km', 'duration_minutes', 'rest_seconds')
 
     def create(self, validated_data):
         """
         Handles the creation of the Activity and its associated, nested SetLog objects.
+        The sets are written with one bulk INSERT, in the same transaction as the activity,
+        whose set aggregates are computed from the incoming data up front. The
+        day's rollup row and the user's personal records are updated before commit.
         """
         sets_data = validated_data.pop('sets')
-        activity = Activity.objects.create(**validated_data)
-        for set_data in sets_data:
-            SetLog.objects.create(activity=activity, **set_data)
+        with transaction.atomic():
+            activity = Activity(**validated_data)
+            activity.update_set_aggregates(sets_data)
+            activity.save()
+            self._create_sets(activity, sets_data)
+            refresh_daily_stats(activity.user_id, [activity.date])
+            record_new_sets(activity.user_id, [(activity, sets_data)])
         return activity
 
     def update(self, instance, validated_data):
         """
-        Handles updating the Activity and replacing its SetLog objects.
+        Handles updating the Activity and its SetLog objects. Incoming sets are
+        diffed against the stored ones (see _sync_sets), so only changed rows are written.
+        The activity's set aggregates, the daily rollups of its old and new date
+        and the personal records of its exercises are refreshed in the same transaction.
         """
         # Pop the nested sets data
         sets_data = validated_data.pop('sets', None)
 
-        # Update the main activity instance
-        instance.name = validated_data.get('name', instance.name)
-        instance.date = validated_data.get('date', instance.date)
-        instance.duration = validated_data.get('duration', instance.duration)
-        instance.notes = validated_data.get('notes', instance.notes)
-        instance.fitness_activity = validated_data.get('fitness_activity', instance.fitness_activity)
-        instance.save()
-
-        # If sets data is provided, delete old sets and create new ones
-        if sets_data is not None:
-            # Delete all existing sets for this activity
-            instance.sets.all().delete()
-            # Create new sets from the provided data
-            for set_data in sets_data:
-                SetLog.objects.create(activity=instance, **set_data)
+        with transaction.atomic():
+            previous_date = instance.date
+            # Update the main activity instance
+            instance.name = validated_data.get('name', instance.name)
+            instance.date = validated_data.get('date', instance.date)
+            instance.duration = validated_data.get('duration', instance.duration)
+            instance.notes = validated_data.get('notes', instance.notes)
+            instance.fitness_activity = validated_data.get('fitness_activity', instance.fitness_activity)
+
+            # Edits can lower a record, so the exercises involved are recomputed
+            affected_exercises = set()
+            if sets_data is not None:
+                sets, affected_exercises = self._sync_sets(instance, sets_data)
+                instance.update_set_aggregates(sets)
+                affected_exercises.update(set_log.exercise_name for set_log in sets)
+            elif instance.date != previous_date:
+                affected_exercises.update(instance.sets.values_list('exercise_name', flat=True))
+            instance.save()
+            refresh_daily_stats(instance.user_id, {previous_date, instance.date})
+            recompute_personal_records(instance.user_id, affected_exercises)
 
         return instance
 
+    def _create_sets(self, activity, sets_data):
+        now = timezone.now()
+        return SetLog.objects.bulk_create([
+            SetLog(activity=activity, created_at=now, **{field: set_data.get(field) for field in self.SET_FIELDS})
+            for set_data in sets_data
+        ])
+
+    def _sync_sets(self, activity, sets_data):
+        """
+        Makes the activity's sets match `sets_data` with at most one bulk UPDATE,
+        one bulk INSERT and one DELETE. Incoming sets carrying the id of a stored
+        set update that set; the others are paired with the remaining stored sets
+        by position. Unpaired incoming sets are inserted, unpaired stored sets deleted.
+        Returns the activity's sets as they now are, and the set of exercise names
+        the stored sets had before.
+        """
+        existing = list(activity.sets.order_by('created_at', 'id'))
+        previous_exercises = {set_log.exercise_name for set_log in existing}
+        by_id = {set_log.id: set_log for set_log in existing}
+
+        pairs, unmatched = [], []
+        for set_data in sets_data:
+            set_log = by_id.pop(set_data.get('id'), None)
+            if set_log is not None:
+                pairs.append((set_log, set_data))
+            else:
+                unmatched.append(set_data)
+        remaining = [set_log for set_log in existing if set_log.id in by_id]
+        pairs.extend(zip(remaining, unmatched))
+        to_create = unmatched[len(remaining):]
+        to_delete = [set_log.id for set_log in remaining[len(unmatched):]]
+
+        to_update = []
+        for set_log, set_data in pairs:
+            changed = False
+            for field in self.SET_FIELDS:
+                value = set_data.get(field)
+                if getattr(set_log, field) != value:
+                    setattr(set_log, field, value)
+                    changed = True
+            if changed:
+                to_update.append(set_log)
+
+        if to_update:
+            SetLog.objects.bulk_update(to_update, self.SET_FIELDS)
+        created = self._create_sets(activity, to_create) if to_create else []
+        if to_delete:
+            SetLog.objects.filter(id__in=to_delete).delete()
+            record_deletions(activity.user_id, 'setlog', to_delete)
+        return [set_log for set_log, _ in pairs] + created, previous_exercises
+
+class ActivityImportSerializer(ActivitySerializer):
+    """
+    Validates one item of a bulk activity import. fitness_activity_id is checked
+    against context['fitness_activities'], resolved once for the whole batch,
+    instead of one query per item.
+    """
+    fitness_activity_id = serializers.IntegerField(required=False, allow_null=True, write_only=True)
+
+    def validate_fitness_activity_id(self, value):
+        if value is not None and value not in self.context.get('fitness_activities', {}):
+            raise serializers.ValidationError(f'Invalid pk "{value}" - object does not exist.')
+        return value
+
 class FoodSerializer(serializers.ModelSerializer):
     class Meta:
         model = Food
@@ -463,6 +557,14 @@ class HealthDataLogSerializer(serializers.ModelSerializer):
             'spo2', 'stress_level', 'steps_today'
         ]
 
+class PersonalRecordSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PersonalRecord
+        fields = [
+            'exercise_name', 'max_weight_kg', 'max_weight_reps', 'max_weight_date',
+            'estimated_1rm_kg', 'estimated_1rm_date', 'best_volume_kg', 'best_volume_date', 'updated_at'
+        ]
+
 #-------------------------------------------------------------------------------
 # Serializers for the Champion Space
 #-------------------------------------------------------------------------------
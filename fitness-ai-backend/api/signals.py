@@ -0,0 +1,31 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Injury, FitnessActivity
+from .catalog import invalidate_catalog_snapshot
+from .injury_index import (
+    invalidate_injury_index, sync_injury_body_parts, discard_injury_index_artifact
+)
+
+
+@receiver(post_save, sender=Injury)
+def injury_saved(sender, instance, raw=False, **kwargs):
+    """Keeps the body-part lookup rows in sync and marks the injury index stale."""
+    if not raw:
+        sync_injury_body_parts([instance])
+    discard_injury_index_artifact()
+    invalidate_injury_index()
+
+
+@receiver(post_delete, sender=Injury)
+def injury_deleted(sender, **kwargs):
+    """Lookup rows cascade with the injury; only the index needs invalidating."""
+    discard_injury_index_artifact()
+    invalidate_injury_index()
+
+
+@receiver(post_save, sender=FitnessActivity)
+@receiver(post_delete, sender=FitnessActivity)
+def fitness_activity_changed(sender, **kwargs):
+    """Any change to the activity catalog makes cached catalog snapshots stale."""
+    invalidate_catalog_snapshot()
@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Activity, SetLog, HealthDataLog, DeletedRecord
+
+CURSOR_SALT = 'api.sync.cursor'
+# Changes per stream and response; a client with more to catch up calls again
+SYNC_PAGE_SIZE = 500
+# Rows newer than this are left for the next call: a row's updated_at is set
+# before its transaction commits, so a still-open transaction could otherwise
+# commit a row behind a cursor that has already moved past it.
+SYNC_SETTLE_SECONDS = 5
+
+ACTIVITY_SYNC_FIELDS = ('id', 'name', 'date', 'timestamp', 'duration', 'notes', 'fitness_activity_id', 'updated_at')
+SET_SYNC_FIELDS = (
+    'id', 'activity_id', 'exercise_name', 'weight_kg', 'reps', 'distance_km',
+    'duration_minutes', 'rest_seconds', 'created_at',
+)
+HEALTH_LOG_SYNC_FIELDS = (
+    'id', 'timestamp', 'systolic_bp', 'diastolic_bp', 'spo2', 'stress_level', 'steps_today', 'updated_at',
+)
+
+# Tombstone model_name -> key in the response's 'deleted' section
+# Health logs have no entry: they can only be created, never edited or deleted
+DELETED_KEYS = {'activity': 'activities', 'setlog': 'sets'}
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def record_deletions(user_id, model_name, object_ids):
+    """Stores tombstones for deleted rows so syncing clients learn about them."""
+    now = timezone.now()
+    DeletedRecord.objects.bulk_create([
+        DeletedRecord(user_id=user_id, model_name=model_name, object_id=object_id, deleted_at=now)
+        for object_id in object_ids
+    ])
+
+
+def _streams(user):
+    """stream name -> (queryset, timestamp field, values fields)"""
+    # Sets have no stream of their own: every set write re-saves its activity,
+    # so the changed sets are those of the activities in the activity delta.
+    return {
+        'activities': (Activity.objects.filter(user=user), 'updated_at', ACTIVITY_SYNC_FIELDS),
+        'health_logs': (HealthDataLog.objects.filter(user=user), 'updated_at', HEALTH_LOG_SYNC_FIELDS),
+        'deleted': (DeletedRecord.objects.filter(user=user), 'deleted_at', ('id', 'model_name', 'object_id', 'deleted_at')),
+    }
+
+
+def _sets_of(activity_ids):
+    """All current sets of the given activities, read through the SetLog activity index."""
+    if not activity_ids:
+        return []
+    return list(
+        SetLog.objects.filter(activity_id__in=activity_ids)
+        .order_by('activity_id', 'created_at', 'id').values(*SET_SYNC_FIELDS)
+    )
+
+
+def encode_cursor(positions):
+    return signing.dumps(
+        {stream: [moment.isoformat(), last_id] for stream, (moment, last_id) in positions.items()},
+        salt=CURSOR_SALT, compress=True,
+    )
+
+
+def decode_cursor(cursor):
+    """Opaque cursor -> {stream: (timestamp, last id)}; raises InvalidCursor."""
+    try:
+        data = signing.loads(cursor, salt=CURSOR_SALT)
+        positions = {}
+        for stream, (moment, last_id) in data.items():
+            positions[stream] = (parse_datetime(moment), int(last_id))
+        return positions
+    except (signing.BadSignature, TypeError, ValueError, AttributeError):
+        raise InvalidCursor('Invalid sync cursor.')
+
+
+def changes_since(user, cursor=None, page_size=SYNC_PAGE_SIZE):
+    """
+    Rows created, updated or deleted since `cursor` (everything if None), read
+    per stream by keyset on (timestamp, id) so each call costs one indexed query
+    per stream whatever the history size. 'sets' holds every set of the changed
+    activities, fetched by activity id. Returns the response body including
+    the cursor to send next time.
+    """
+    positions = decode_cursor(cursor) if cursor else {}
+    # Cursors from before sets were derived from activities carry a 'sets' position
+    positions.pop('sets', None)
+    horizon = timezone.now() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+
+    body = {'deleted': {key: [] for key in DELETED_KEYS.values()}}
+    has_more = False
+    for stream, (queryset, time_field, fields) in _streams(user).items():
+        rows = queryset.filter(**{f'{time_field}__lte': horizon})
+        if stream in positions:
+            moment, last_id = positions[stream]
+            rows = rows.filter(Q(**{f'{time_field}__gt': moment}) | Q(**{time_field: moment, 'id__gt': last_id}))
+        rows = list(rows.order_by(time_field, 'id').values(*fields)[:page_size + 1])
+
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            has_more = True
+        if rows:
+            positions[stream] = (rows[-1][time_field], rows[-1]['id'])
+
+        if stream == 'deleted':
+            for row in rows:
+                body['deleted'][DELETED_KEYS[row['model_name']]].append(row['object_id'])
+        else:
+            body[stream] = rows
+        if stream == 'activities':
+            body['sets'] = _sets_of([row['id'] for row in rows])
+
+    body['cursor'] = encode_cursor(positions)
+    body['has_more'] = has_more
+    return body
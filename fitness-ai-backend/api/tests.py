@@ -1,3 +1,97 @@
+import datetime
+
+import numpy as np
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.models import User, Profile, Activity, SetLog, FitnessActivity, UserDailyStats
+from api.injury_index import top_k
+from api.rollups import refresh_daily_stats
+from api.views import FitnessPlanView, CalendarLogView
+
+
+class FitnessPlanViewTests(TestCase):
+    """The plan is scored against the user's logged activities, so it must work once they have some."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='planner', email='planner@example.com', password='pass12345')
+        Profile.objects.create(user=self.user, goal='muscle_gain', experience_level='intermediate')
+        self.bench = FitnessActivity.objects.create(
+            name='Barbell Bench Press', category='Strength', intensity='high',
+            description='Chest press', target_muscles='Chest, Triceps', difficulty_level=5,
+        )
+        FitnessActivity.objects.create(
+            name='Treadmill Run', category='Cardio', intensity='moderate',
+            description='Running', target_muscles='Legs', difficulty_level=4,
+        )
+        activity = Activity.objects.create(
+            user=self.user, name='Bench press', fitness_activity=self.bench,
+            date=timezone.localdate() - datetime.timedelta(days=2), set_count=2,
+        )
+        SetLog.objects.create(activity=activity, exercise_name='Bench', weight_kg=60, reps=8)
+        SetLog.objects.create(activity=activity, exercise_name='Bench', weight_kg=65, reps=6)
+
+    def get_plan(self, params=None):
+        request = APIRequestFactory().get('/api/fitness-plan/', params or {})
+        force_authenticate(request, user=self.user)
+        return FitnessPlanView.as_view()(request)
+
+    def test_plan_for_user_with_logged_activities(self):
+        response = self.get_plan()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['goal'], 'muscle_gain')
+        self.assertTrue(response.data['plan'])
+
+    def test_weekly_plan_for_user_with_logged_activities(self):
+        response = self.get_plan({'mode': 'weekly'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['mode'], 'weekly')
+        self.assertTrue(response.data['plan'])
+
+
+class TopKTests(TestCase):
+
+    def test_ties_keep_corpus_order(self):
+        rows = np.arange(10)
+        scores = np.array([0.9, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.1])
+        best_rows, best_scores = top_k(rows, scores, 5)
+        self.assertEqual(list(best_rows), [0, 1, 2, 3, 4])
+        self.assertEqual(list(best_scores), [0.9, 0.5, 0.5, 0.5, 0.5])
+
+
+class DailyStatsRefreshTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='roller', email='roller@example.com', password='pass12345')
+        self.day = datetime.date(2026, 3, 2)
+
+    def log_activity(self, weight):
+        activity = Activity.objects.create(user=self.user, name='Squats', date=self.day, duration=30)
+        SetLog.objects.create(activity=activity, exercise_name='Squat', weight_kg=weight, reps=5)
+        return activity
+
+    def test_two_refreshes_for_the_same_day(self):
+        self.log_activity(100)
+        refresh_daily_stats(self.user.id, [self.day])
+        self.log_activity(110)
+        refresh_daily_stats(self.user.id, [self.day])
+
+        stats = UserDailyStats.objects.get(user=self.user, date=self.day)
+        self.assertEqual(stats.workout_count, 2)
+        self.assertEqual(stats.total_duration, 60)
+        self.assertEqual(stats.exercise_stats['Squat'], {'sets': 2, 'weighted_sets': 2, 'max_weight': 110})
+
+
+class CalendarLogViewTests(TestCase):
 
-# Create your tests here.
+    def test_last_representable_month(self):
+        user = User.objects.create_user(username='calendar', email='calendar@example.com', password='pass12345')
+        for params in ({'year': '9999', 'month': '12'}, {'year': '9999', 'month': '12', 'summary': '1'}):
+            request = APIRequestFactory().get('/api/calendar-logs/', params)
+            force_authenticate(request, user=user)
+            response = CalendarLogView.as_view()(request)
+            self.assertEqual(response.status_code, 200)
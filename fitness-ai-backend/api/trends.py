@@ -0,0 +1,76 @@
+import numpy as np
+from scipy import stats
+
+# Daily slope (kg/day) beyond which a lift counts as improving or declining
+TREND_SLOPE_THRESHOLD = 0.1
+MIN_TREND_POINTS = 3
+CONFIDENCE_LEVEL = 0.95
+PROJECTION_DAYS = (7, 30)
+
+
+def fit_linear_trends(groups, day_numbers, values, group_count):
+    """
+    Ordinary least squares fit of value ~ day for every group at once. `groups`
+    holds each point's group code (0..group_count-1); days are measured from each
+    group's first point. All groups are fitted from grouped sums in one pass over
+    the arrays (np.bincount), with no per-group loop.
+
+    Returns a dict of per-group arrays: n, slope, intercept, slope_low/high
+    (confidence interval of the slope), last_day, and for every horizon in
+    PROJECTION_DAYS projection_<h>, projection_<h>_low/high (confidence interval
+    of the fitted line at last_day + h). Groups with fewer than MIN_TREND_POINTS
+    points, or all points on one day, get NaN.
+    """
+    groups = np.asarray(groups, dtype=np.intp)
+    day_numbers = np.asarray(day_numbers, dtype=float)
+    values = np.asarray(values, dtype=float)
+
+    first_day = np.full(group_count, np.inf)
+    np.minimum.at(first_day, groups, day_numbers)
+    x = day_numbers - first_day[groups]
+    last_day = np.zeros(group_count)
+    np.maximum.at(last_day, groups, x)
+
+    def grouped_sum(weights):
+        return np.bincount(groups, weights=weights, minlength=group_count)
+
+    n = np.bincount(groups, minlength=group_count).astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = grouped_sum(x) / n
+        y_mean = grouped_sum(values) / n
+        # Centered sums of squares and cross products
+        sxx = grouped_sum(x * x) - n * x_mean ** 2
+        sxy = grouped_sum(x * values) - n * x_mean * y_mean
+        syy = grouped_sum(values * values) - n * y_mean ** 2
+
+        fitted = (n >= MIN_TREND_POINTS) & (sxx > 1e-9)
+        slope = np.where(fitted, sxy / sxx, np.nan)
+        intercept = y_mean - slope * x_mean
+        residual_variance = np.maximum(syy - slope * sxy, 0) / (n - 2)
+        t_value = stats.t.ppf(0.5 + CONFIDENCE_LEVEL / 2, np.where(fitted, n - 2, 1))
+        slope_margin = t_value * np.sqrt(residual_variance / sxx)
+
+        result = {
+            'n': n.astype(int),
+            'slope': slope,
+            'intercept': intercept,
+            'slope_low': slope - slope_margin,
+            'slope_high': slope + slope_margin,
+            'last_day': last_day,
+        }
+        for horizon in PROJECTION_DAYS:
+            x_new = last_day + horizon
+            projection = intercept + slope * x_new
+            margin = t_value * np.sqrt(residual_variance * (1 / n + (x_new - x_mean) ** 2 / sxx))
+            result[f'projection_{horizon}'] = projection
+            result[f'projection_{horizon}_low'] = projection - margin
+            result[f'projection_{horizon}_high'] = projection + margin
+    return result
+
+
+def trend_label(slope):
+    if slope > TREND_SLOPE_THRESHOLD:
+        return "Improving"
+    if slope < -TREND_SLOPE_THRESHOLD:
+        return "Declining"
+    return "Stagnant"
@@ -16,13 +16,19 @@ urlpatterns = [
 
     # --- Activity Logging ---
     path('activities/', views.ActivityListCreateView.as_view(), name='activity-list-create'),
+    path('activities/export/', views.ActivityExportView.as_view(), name='activity-export'),
+    path('activities/bulk/', views.ActivityBulkImportView.as_view(), name='activity-bulk-import'),
     path('activities/<int:pk>/', views.ActivityDetailView.as_view(), name='activity-detail'),
     path('fitness-activities/', views.FitnessActivityListView.as_view(), name='fitness-activity-list'),
+    path('sync/', views.ActivitySyncView.as_view(), name='sync'),
     path('calendar-logs/', views.CalendarLogView.as_view(), name='calendar-logs'),
+    path('calendar-logs/<str:day>/', views.CalendarDayLogView.as_view(), name='calendar-day-logs'),
 
     # --- AI/ML & Planning ---
     path('fitness-plan/', views.FitnessPlanView.as_view(), name='fitness-plan'),
     path('injury-check/', views.InjuryCheckView.as_view(), name='injury-check'),
+    path('injury-check/batch/', views.InjuryCheckBatchView.as_view(), name='injury-check-batch'),
+    path('injury-check/cache-stats/', views.InjuryCheckCacheStatsView.as_view(), name='injury-check-cache-stats'),
     
     # --- Nutrition ---
     path('nutrition-summary/', views.NutritionSummaryView.as_view(), name='nutrition-summary'),
@@ -40,6 +46,7 @@ urlpatterns = [
     path('health-data/log/', views.LogHealthDataView.as_view(), name='health-log'),
     path('health-data/history/', views.HealthDataHistoryView.as_view(), name='health-history'),
     path('health-data/analysis/', views.HealthDataAnalysisView.as_view(), name='health-analysis'),
+    path('personal-records/', views.PersonalRecordListView.as_view(), name='personal-records'),
     
     # --- Achievements & Rewards ---
     path('achievements/progress/', views.UserProgressView.as_view(), name='user-achievements'),
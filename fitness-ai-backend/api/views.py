@@ -1,38 +1,53 @@
 import random
+import hashlib
 import logging
 import numpy as np
 import datetime
 import pandas as pd
 
+from django.db import transaction
 from django.db.models import Q, Sum, F, Count, Avg, Max
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
 from rest_framework import generics, status, serializers
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from .serializers import UserSerializer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from django.utils import timezone
 from datetime import timedelta, date
 from django.db.models import Sum, Count, Max, F
 from django.db.models.functions import TruncWeek, TruncHour
-from sklearn.linear_model import LinearRegression
 from collections import defaultdict
+from calendar import monthrange
 from sklearn.ensemble import IsolationForest
 
 
 from .models import (
     User, Profile, Activity, SetLog, Food, Injury, 
-    Exercise, Workout, TrainingCategory, FitnessActivity, Achievement, UserAchievement, CompetitionCategory, CompetitionType, HealthDataLog
+    Exercise, Workout, TrainingCategory, FitnessActivity, Achievement, UserAchievement, CompetitionCategory, CompetitionType, HealthDataLog,
+    UserDailyStats, PersonalRecord
 )
 from .serializers import (
-    UserSerializer, ProfileSerializer, ActivitySerializer, SetLogSerializer,
+    UserSerializer, ProfileSerializer, ActivitySerializer, ActivityImportSerializer, SetLogSerializer,
     FoodSerializer, InjurySerializer, ExerciseSerializer, WorkoutSerializer,
     TrainingCategorySerializer, FitnessActivitySerializer, AchievementSerializer, UserAchievementSerializer, CompetitionCategoryListSerializer, CompetitionCategoryDetailSerializer, CompetitionTypeDetailSerializer,
-    HealthDataLogSerializer
+    HealthDataLogSerializer, PersonalRecordSerializer
 )
+from .catalog import get_catalog_snapshot
+from .plan_scoring import TrainingHistory, score_catalog, top_activities
+from .precompute import get_precomputed_payload
+from .query_counting import StatementCountMixin
+from .exports import stream_csv, stream_ndjson
+from .sync import changes_since, record_deletions, InvalidCursor
+from .rollups import refresh_daily_stats
+from .records import record_new_sets, recompute_personal_records
+from .trends import fit_linear_trends, trend_label
+from .dashboard_cache import get_or_build_dashboard
+from .pagination import ActivityKeysetPagination, wants_keyset_pagination
+from .injury_index import get_injury_index, get_injury_check_cache, check_injuries
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -75,16 +90,31 @@ class ProfileView(generics.RetrieveUpdateAPIView):
             )
 
 
-class ActivityListCreateView(generics.ListCreateAPIView):
+class ActivityListCreateView(StatementCountMixin, generics.ListCreateAPIView):
     """
     API view for listing and creating user activities.
     Allows logging even if the activity doesn't exist in FitnessActivity.
+    Reports the SQL statements each request issued in X-DB-Statements.
+    Lists use page numbers by default; ?pagination=cursor switches to keyset
+    pagination (see pagination.py), whose cost doesn't grow with page depth.
     """
     serializer_class = ActivitySerializer
     permission_classes = [IsAuthenticated]
 
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if wants_keyset_pagination(self.request):
+                self._paginator = ActivityKeysetPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
     def get_queryset(self):
-        return Activity.objects.filter(user=self.request.user).order_by('-date')
+        # Serializing a page reads every activity's category and sets
+        return Activity.objects.filter(user=self.request.user).select_related(
+            'fitness_activity'
+        ).prefetch_related('sets').order_by('-date', '-timestamp', '-id')
 
     def perform_create(self, serializer):
         try:
@@ -96,26 +126,26 @@ class ActivityListCreateView(generics.ListCreateAPIView):
             activity_name = activity_name.strip()
             logger.info(f"Attempting to log activity: '{activity_name}'")
 
-            # Try to find a matching FitnessActivity (optional link)
-            matching_activity = FitnessActivity.objects.filter(name__iexact=activity_name).first()
-
-            if not matching_activity:
-                matching_activity = FitnessActivity.objects.filter(
-                    Q(name__icontains=activity_name) | Q(name__istartswith=activity_name)
-                ).first()
-
-            if matching_activity:
-                logger.info(f"Linked to existing FitnessActivity: {matching_activity.name}")
-                activity = serializer.save(
-                    user=self.request.user,
-                    linked_fitness_activity=matching_activity  # remove if not in your model
-                )
-            else:
-                # Proceed without a link — still log the user activity
-                logger.warning(
-                    f'No FitnessActivity match found for "{activity_name}". Logging as custom activity.'
-                )
+            if serializer.validated_data.get('fitness_activity'):
+                # The client already linked it explicitly
                 activity = serializer.save(user=self.request.user)
+            else:
+                # Try to find a matching FitnessActivity (optional link) in the
+                # in-memory catalog's name index, no DB scan needed
+                matching_activity, similarity = get_catalog_snapshot().match_name(activity_name)
+
+                if matching_activity:
+                    logger.info(f"Linked to existing FitnessActivity: {matching_activity.name} (similarity {similarity:.2f})")
+                    activity = serializer.save(
+                        user=self.request.user,
+                        fitness_activity_id=matching_activity.id
+                    )
+                else:
+                    # Proceed without a link — still log the user activity
+                    logger.warning(
+                        f'No FitnessActivity match found for "{activity_name}". Logging as custom activity.'
+                    )
+                    activity = serializer.save(user=self.request.user)
 
             logger.info(f"Activity successfully logged: {activity.name} for user {self.request.user.username}")
 
@@ -128,63 +158,187 @@ class ActivityListCreateView(generics.ListCreateAPIView):
             })
 
 
+class ActivityBulkImportView(StatementCountMixin, APIView):
+    """
+    API view for importing many activities with nested sets in one request,
+    e.g. a watch or app history import. Expects {"activities": [...]} with items
+    shaped like ActivityListCreateView's POST body.
+    Explicit fitness_activity_id links are resolved with one query and the rest
+    are linked by name through the catalog's name index; valid items are then
+    written with bulk inserts in a single transaction. Invalid items are reported
+    per position and don't stop the others from being imported.
+    """
+    permission_classes = [IsAuthenticated]
+    max_activities = 1000
+
+    def post(self, request, *args, **kwargs):
+        items = request.data.get('activities') if isinstance(request.data, dict) else request.data
+        if not items or not isinstance(items, list):
+            return Response({'error': 'Please provide a non-empty list of activities.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.max_activities:
+            return Response(
+                {'error': f'An import can contain at most {self.max_activities} activities.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            # Resolve every explicit link in one query
+            requested_ids = {
+                self._requested_fitness_activity_id(item) for item in items if isinstance(item, dict)
+            } - {None}
+            fitness_activities = FitnessActivity.objects.in_bulk(requested_ids) if requested_ids else {}
+
+            results = [None] * len(items)
+            valid = []  # (position, validated_data)
+            for position, item in enumerate(items):
+                if not isinstance(item, dict):
+                    results[position] = {'index': position, 'errors': {'detail': 'Each activity must be an object.'}}
+                    continue
+                serializer = ActivityImportSerializer(data=item, context={'fitness_activities': fitness_activities})
+                if serializer.is_valid():
+                    valid.append((position, serializer.validated_data))
+                else:
+                    results[position] = {'index': position, 'errors': serializer.errors}
+
+            catalog = get_catalog_snapshot()
+            activities, sets_per_activity = [], []
+            for position, data in valid:
+                data = dict(data)
+                sets_data = data.pop('sets')
+                if not data.get('fitness_activity_id'):
+                    matching_activity, _ = catalog.match_name(data['name'])
+                    data['fitness_activity_id'] = matching_activity.id if matching_activity else None
+                activity = Activity(user=request.user, **data)
+                activity.update_set_aggregates(sets_data)
+                activities.append(activity)
+                sets_per_activity.append(sets_data)
+
+            created_ids = self._bulk_insert(request.user, activities, sets_per_activity)
+            for (position, _), activity_id in zip(valid, created_ids):
+                results[position] = {'index': position, 'id': activity_id}
+
+            failed = len(items) - len(valid)
+            logger.info(f"Bulk import of {len(valid)} activities ({failed} rejected) for user: {request.user.username}")
+            return Response(
+                {'created': len(valid), 'failed': failed, 'results': results},
+                status=status.HTTP_201_CREATED if valid else status.HTTP_400_BAD_REQUEST
+            )
+
+        except Exception as e:
+            logger.error(f"Error in bulk activity import for user {request.user.username}: {str(e)}")
+            return Response(
+                {'error': 'Import failed due to an internal error. Nothing was imported.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    @staticmethod
+    def _requested_fitness_activity_id(item):
+        """The item's fitness_activity_id coerced like ActivityImportSerializer will, or None."""
+        try:
+            return serializers.IntegerField().to_internal_value(item.get('fitness_activity_id'))
+        except serializers.ValidationError:
+            return None
+
+    @staticmethod
+    def _bulk_insert(user, activities, sets_per_activity):
+        """
+        Inserts the activities and their sets with one bulk INSERT each (batched
+        for large imports) inside one transaction, together with the daily rollups
+        of the imported days and the user's personal records. Returns the new activity ids.
+        """
+        if not activities:
+            return []
+        with transaction.atomic():
+            last_id_before = Activity.objects.filter(user=user).aggregate(last=Max('id'))['last'] or 0
+            Activity.objects.bulk_create(activities, batch_size=500)
+
+            if activities[0].pk is None:
+                # The backend doesn't return ids from bulk inserts (SQLite/MySQL on
+                # this Django version). Auto-increment ids are assigned in insert
+                # order and nobody else can write to our rows inside this transaction
+                # on SQLite, so read them back.
+                created_ids = list(
+                    Activity.objects.filter(user=user, id__gt=last_id_before)
+                    .order_by('id').values_list('id', flat=True)
+                )
+                if len(created_ids) != len(activities):
+                    raise RuntimeError('Could not read back the ids of the imported activities.')
+                for activity, activity_id in zip(activities, created_ids):
+                    activity.pk = activity_id
+
+            now = timezone.now()
+            SetLog.objects.bulk_create([
+                SetLog(
+                    activity_id=activity.pk, created_at=now,
+                    **{field: set_data.get(field) for field in ActivitySerializer.SET_FIELDS}
+                )
+                for activity, sets_data in zip(activities, sets_per_activity)
+                for set_data in sets_data
+            ], batch_size=1000)
+            refresh_daily_stats(user.id, {activity.date for activity in activities})
+            record_new_sets(user.id, zip(activities, sets_per_activity))
+        return [activity.pk for activity in activities]
+
+
+class ActivityExportView(APIView):
+    """
+    API view streaming the user's whole activity and set history for download.
+    ?output=csv (default, one row per set) or ?output=ndjson (one activity per
+    line, sets nested). Rows are read in keyset-paginated chunks and written as
+    they are produced, so memory use doesn't grow with the size of the history.
+    """
+    permission_classes = [IsAuthenticated]
+    # 'format' is taken by DRF's renderer selection
+    outputs = {
+        'csv': (stream_csv, 'text/csv'),
+        'ndjson': (stream_ndjson, 'application/x-ndjson'),
+    }
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get('output', 'csv').lower()
+        if output not in self.outputs:
+            return Response(
+                {'error': f"Unsupported output '{output}'. Use one of: {', '.join(self.outputs)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        stream, content_type = self.outputs[output]
+        filename = f'activities-{request.user.username}-{timezone.localdate().isoformat()}.{output}'
+        response = StreamingHttpResponse(self._log_errors(stream(request.user), request.user), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        logger.info(f"Activity export ({output}) started for user: {request.user.username}")
+        return response
+
+    @staticmethod
+    def _log_errors(chunks, user):
+        # Errors raised mid-stream can't become an error response any more
+        try:
+            yield from chunks
+        except Exception as e:
+            logger.error(f"Error streaming activity export for user {user.username}: {str(e)}")
+            raise
+
+
 class FitnessPlanView(APIView):
     """
-    API view for generating personalized fitness plans based on user profile
+    API view for generating personalized fitness plans based on user profile.
+    With ?mode=weekly the plan is deterministic for the current ISO week and
+    served from precompute_plans' output or the cache; otherwise a fresh
+    random plan is generated.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
         try:
             profile = Profile.objects.get(user=request.user)
-            goal = profile.goal
-            experience = profile.experience_level
 
-            difficulty_map = {
-                'beginner': (1, 4),      # Difficulty levels 1 to 4
-                'intermediate': (3, 7),  # Difficulty levels 3 to 7
-                'advanced': (6, 10),     # Difficulty levels 6 to 10
-            }
-            min_diff, max_diff = difficulty_map.get(experience, (1, 10)) # Default to all if not found
-
-            # Define plan structure based on goal
-            if goal == 'muscle_gain':
-                plan_structure = {'Strength': 4, 'Cardio': 1, 'Sport': 1}
-            elif goal == 'fat_loss':
-                plan_structure = {'Strength': 3, 'Cardio': 3, 'Flexibility': 1}
-            elif goal == 'endurance':
-                plan_structure = {'Cardio': 4, 'Strength': 2, 'Flexibility': 1}
-            else:  # maintenance
-                plan_structure = {'Strength': 3, 'Cardio': 2, 'Sport': 1, 'Flexibility': 1}
-
-            generated_plan = []
-            for category, count in plan_structure.items():
-                activities = list(FitnessActivity.objects.filter(
-                    category=category,
-                    difficulty_level__gte=min_diff,
-                    difficulty_level__lte=max_diff,
-                    is_active=True
-                ))
-                if len(activities) >= count:
-                    selected_activities = random.sample(activities, count)
-                    generated_plan.extend(selected_activities)
-                elif activities:
-                    generated_plan.extend(activities)
-
-            if not generated_plan:
-                return Response({
-                    'message': 'No fitness activities available for your goal and experience level.',
-                    'plan': []
-                })
+            if request.query_params.get('mode') == 'weekly':
+                plan_response = get_precomputed_payload(profile, 'fitness_plan') or self.get_weekly_plan(profile)
+            else:
+                plan_response = self.generate_plan(profile)
 
-            serializer = FitnessActivitySerializer(generated_plan, many=True)
-            logger.info(f"Fitness plan for '{experience}' user generated: {request.user.username}")
-            return Response({
-                'goal': goal,
-                'experience_level': experience,
-                'plan': serializer.data,
-                'total_activities': len(serializer.data)
-            })
+            logger.info(f"Fitness plan for '{profile.experience_level}' user generated: {request.user.username}")
+            return Response(plan_response)
 
         except Profile.DoesNotExist:
             return Response({'error': 'User profile not found.'}, status=status.HTTP_404_NOT_FOUND)
@@ -192,112 +346,117 @@ class FitnessPlanView(APIView):
             logger.error(f"Error generating fitness plan for {request.user.username}: {str(e)}")
             return Response({'error': 'Failed to generate fitness plan.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @staticmethod
+    def generate_plan(profile, rng=random, today=None):
+        """
+        Builds the plan response for a profile. Every catalog activity is scored
+        against the user's recent training history (see plan_scoring.py) and the
+        best ones per category are picked; `rng` seeds the tie-breaking jitter.
+        """
+        goal = profile.goal
+        experience = profile.experience_level
 
-class InjuryCheckView(APIView):
-    """
-    API view for injury diagnosis using TF-IDF and Cosine Similarity
-    """
-    permission_classes = [IsAuthenticated]
+        difficulty_map = {
+            'beginner': (1, 4),      # Difficulty levels 1 to 4
+            'intermediate': (3, 7),  # Difficulty levels 3 to 7
+            'advanced': (6, 10),     # Difficulty levels 6 to 10
+        }
+        min_diff, max_diff = difficulty_map.get(experience, (1, 10)) # Default to all if not found
 
-    def post(self, request, *args, **kwargs):
-        try:
-            symptoms = request.data.get('symptoms', [])
-            body_part = request.data.get('body_part', '').strip()
+        # Define plan structure based on goal
+        if goal == 'muscle_gain':
+            plan_structure = {'Strength': 4, 'Cardio': 1, 'Sport': 1}
+        elif goal == 'fat_loss':
+            plan_structure = {'Strength': 3, 'Cardio': 3, 'Flexibility': 1}
+        elif goal == 'endurance':
+            plan_structure = {'Cardio': 4, 'Strength': 2, 'Flexibility': 1}
+        else:  # maintenance
+            plan_structure = {'Strength': 3, 'Cardio': 2, 'Sport': 1, 'Flexibility': 1}
+
+        # Candidates come from the in-memory catalog snapshot, not the DB
+        catalog = get_catalog_snapshot()
+        history = TrainingHistory.for_user(profile.user_id, today)
+        scores = score_catalog(catalog, history, np.random.default_rng(rng.getrandbits(63)))
+
+        generated_plan = []
+        for category, count in plan_structure.items():
+            generated_plan.extend(top_activities(catalog, scores, category, count, min_diff, max_diff))
+
+        if not generated_plan:
+            return {
+                'message': 'No fitness activities available for your goal and experience level.',
+                'plan': []
+            }
 
-            if not body_part:
-                return Response(
-                    {'error': 'A body_part is required.'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        plan_data = [activity.as_dict() for activity in generated_plan]
+        return {
+            'goal': goal,
+            'experience_level': experience,
+            'plan': plan_data,
+            'total_activities': len(plan_data)
+        }
 
-            if not symptoms or not isinstance(symptoms, list) or not any(s.strip() for s in symptoms):
-                 return Response(
-                    {'error': 'Please provide at least one symptom.'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+    @classmethod
+    def get_weekly_plan(cls, profile, today=None):
+        """
+        Returns the user's plan for the current ISO week. Selection is seeded from
+        (user, ISO week, goal, experience_level), so it is stable for the week, and
+        the result is cached until the week ends. A change of goal or experience
+        level gives a new key and therefore a new plan.
+        """
+        today = today or timezone.localdate()
+        iso_year, iso_week, iso_weekday = today.isocalendar()
+        week = f'{iso_year}-W{iso_week:02d}'
+        seed_key = f'{profile.user_id}:{week}:{profile.goal}:{profile.experience_level}'
+        cache_key = f'fitness_plan:weekly:{seed_key}'
 
-            # Find injuries related to the body part
-            possible_injuries = Injury.objects.filter(
-                affected_part__icontains=body_part,
-                is_active=True
-            ).exclude(symptoms__isnull=True).exclude(symptoms__exact='')
+        plan_response = cache.get(cache_key)
+        if plan_response is None:
+            seed = int(hashlib.sha256(seed_key.encode()).hexdigest()[:16], 16)
+            plan_response = cls.generate_plan(profile, random.Random(seed), today)
+            plan_response.update({'mode': 'weekly', 'week': week})
 
-            if not possible_injuries.exists():
-                return Response({
-                    'message': f"No injuries found for '{body_part}' in our database.",
-                    'possible_injuries': [],
-                    'recommendations': [
-                        'Consult with a healthcare professional for an accurate diagnosis.',
-                        'Apply the RICE method (Rest, Ice, Compression, Elevation) if appropriate for minor strains.'
-                    ]
-                })
+            next_monday = today + timedelta(days=8 - iso_weekday)
+            week_end = timezone.make_aware(datetime.datetime.combine(next_monday, datetime.time.min))
+            cache.set(cache_key, plan_response, timeout=max(60, (week_end - timezone.now()).total_seconds()))
+        return plan_response
 
-            # Prepare the text data for the ML model
-            user_symptoms_text = ' '.join(symptoms)
-            db_injuries = list(possible_injuries)
-            
-            # Corpus: a collection of text documents. First is the user's, rest are from DB.
-            corpus = [user_symptoms_text] + [injury.symptoms for injury in db_injuries]
-            
-            # Vectorize the text using TF-IDF
-            # This converts words into a matrix of numbers representing their importance.
-            vectorizer = TfidfVectorizer(stop_words='english')
-            tfidf_matrix = vectorizer.fit_transform(corpus)
-
-            # Calculate cosine similarity between user's symptoms (first item) and all DB injuries
-            # This gives a score from 0 (not similar) to 1 (identical).
-            cosine_sim = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:])
-            
-            # Get the similarity scores as a simple list
-            sim_scores = list(cosine_sim[0])
-
-            # Pair each injury with its similarity score
-            injury_scores = []
-            for i, injury in enumerate(db_injuries):
-                # We only consider injuries with a similarity score > 0.1 to avoid irrelevant results
-                if sim_scores[i] > 0.1: 
-                    injury_scores.append((injury, sim_scores[i]))
-
-            # Sort the injuries based on the similarity scores in descending order
-            sorted_injuries = sorted(injury_scores, key=lambda x: x[1], reverse=True)
-
-            # Format the results for the API response
-            matched_injuries = []
-            for injury, score in sorted_injuries:
-                matched_injuries.append({
-                    'name': injury.name,
-                    'severity': injury.severity,
-                    'symptoms': injury.symptoms, # Show the full symptoms from the DB
-                    'first_aid': injury.first_aid,
-                    'treatment_type': injury.treatment_type,
-                    'recovery_time_days': injury.recovery_time_days or 'N/A',
-                    'similarity_score': round(score * 100, 2), # Convert to a percentage-like score
-                })
-            
-            # Limit to top 5 results
-            matched_injuries = matched_injuries[:5]
-
-            response_data = {
-                'body_part': body_part,
-                'symptoms_checked': symptoms,
-                'possible_injuries': matched_injuries,
-                'total_matches': len(matched_injuries),
-                'recommendations': [
-                    'Rest the affected area and avoid strenuous activity.',
-                    'Apply ice packs for 15-20 minutes every 2-3 hours to reduce swelling.',
-                    'For persistent or severe pain, consult a medical professional.'
-                ],
-                'disclaimer': 'This AI-based check is for informational purposes only and is not a substitute for a professional medical diagnosis. Please consult a healthcare provider.'
-            }
 
-            if matched_injuries:
-                response_data['message'] = f"Found {len(matched_injuries)} possible injury matches for your symptoms."
-            else:
-                response_data['message'] = f"Could not find a strong match for your symptoms. Here are general recommendations:"
+class InjuryCheckView(APIView):
+    """
+    API view for injury diagnosis using TF-IDF and Cosine Similarity.
+    The TF-IDF model is fitted once per injury dataset version (see injury_index.py).
+    """
+    permission_classes = [IsAuthenticated]
+
+    NO_MATCH_RECOMMENDATIONS = [
+        'Consult with a healthcare professional for an accurate diagnosis.',
+        'Apply the RICE method (Rest, Ice, Compression, Elevation) if appropriate for minor strains.'
+    ]
+    GENERAL_RECOMMENDATIONS = [
+        'Rest the affected area and avoid strenuous activity.',
+        'Apply ice packs for 15-20 minutes every 2-3 hours to reduce swelling.',
+        'For persistent or severe pain, consult a medical professional.'
+    ]
+    DISCLAIMER = 'This AI-based check is for informational purposes only and is not a substitute for a professional medical diagnosis. Please consult a healthcare provider.'
 
+    def post(self, request, *args, **kwargs):
+        try:
+            body_part, symptoms, error = self.parse_query(request.data)
+            if error:
+                return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Find injuries related to the body part in the pre-fitted index and score
+            # them; repeated symptom combinations are answered from the result cache.
+            # Only the user's text is vectorized; the injury corpus was fitted once
+            # when the index was built. Scores are cosine similarities from 0 to 1.
+            injury_index = get_injury_index()
+            [(candidate_count, sorted_injuries)] = check_injuries(
+                injury_index, [(body_part, ' '.join(symptoms))], limit=5
+            )
 
             logger.info(f"ML Injury check performed for user: {request.user.username}, body_part: {body_part}")
-            return Response(response_data)
+            return Response(self.build_response(body_part, symptoms, candidate_count, sorted_injuries))
 
         except ImportError:
             logger.error("Scikit-learn is not installed. InjuryCheckView requires it.")
@@ -312,6 +471,124 @@ class InjuryCheckView(APIView):
                 status=500
             )
 
+    @staticmethod
+    def parse_query(data):
+        """Returns (body_part, symptoms, error) for a single injury check query."""
+        symptoms = data.get('symptoms', [])
+        body_part = data.get('body_part', '')
+        body_part = body_part.strip() if isinstance(body_part, str) else ''
+
+        if not body_part:
+            return body_part, symptoms, 'A body_part is required.'
+
+        if (not symptoms or not isinstance(symptoms, list)
+                or not any(isinstance(s, str) and s.strip() for s in symptoms)):
+            return body_part, symptoms, 'Please provide at least one symptom.'
+
+        symptoms = [s for s in symptoms if isinstance(s, str)]
+        return body_part, symptoms, None
+
+    @classmethod
+    def build_response(cls, body_part, symptoms, candidate_count, sorted_injuries):
+        if not candidate_count:
+            return {
+                'message': f"No injuries found for '{body_part}' in our database.",
+                'possible_injuries': [],
+                'recommendations': cls.NO_MATCH_RECOMMENDATIONS,
+            }
+
+        # Format the results for the API response
+        matched_injuries = []
+        for injury, score in sorted_injuries:
+            matched_injuries.append({
+                'name': injury.name,
+                'severity': injury.severity,
+                'symptoms': injury.symptoms, # Show the full symptoms from the DB
+                'first_aid': injury.first_aid,
+                'treatment_type': injury.treatment_type,
+                'recovery_time_days': injury.recovery_time_days or 'N/A',
+                'similarity_score': round(score * 100, 2), # Convert to a percentage-like score
+            })
+
+        response_data = {
+            'body_part': body_part,
+            'symptoms_checked': symptoms,
+            'possible_injuries': matched_injuries,
+            'total_matches': len(matched_injuries),
+            'recommendations': cls.GENERAL_RECOMMENDATIONS,
+            'disclaimer': cls.DISCLAIMER,
+        }
+
+        if matched_injuries:
+            response_data['message'] = f"Found {len(matched_injuries)} possible injury matches for your symptoms."
+        else:
+            response_data['message'] = f"Could not find a strong match for your symptoms. Here are general recommendations:"
+        return response_data
+
+
+class InjuryCheckBatchView(APIView):
+    """
+    API view for running many injury checks in one request.
+    Expects {"queries": [{"body_part": ..., "symptoms": [...]}, ...]} and scores all
+    queries with a single sparse matrix product against the injury corpus.
+    Each result has the same structure as an InjuryCheckView response.
+    """
+    permission_classes = [IsAuthenticated]
+    max_queries = 100
+
+    def post(self, request, *args, **kwargs):
+        queries = request.data.get('queries') if isinstance(request.data, dict) else request.data
+        if not queries or not isinstance(queries, list):
+            return Response({'error': 'Please provide a non-empty list of queries.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(queries) > self.max_queries:
+            return Response(
+                {'error': f'A batch can contain at most {self.max_queries} queries.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            results = [None] * len(queries)
+            parsed = []  # (position, body_part, symptoms) for valid queries
+
+            for position, query in enumerate(queries):
+                if not isinstance(query, dict):
+                    results[position] = {'error': 'Each query must be an object with body_part and symptoms.'}
+                    continue
+                body_part, symptoms, error = InjuryCheckView.parse_query(query)
+                if error:
+                    results[position] = {'error': error}
+                    continue
+                parsed.append((position, body_part, symptoms))
+
+            checked = check_injuries(
+                get_injury_index(),
+                [(body_part, ' '.join(symptoms)) for _, body_part, symptoms in parsed],
+                limit=5
+            )
+            for (position, body_part, symptoms), (candidate_count, sorted_injuries) in zip(parsed, checked):
+                results[position] = InjuryCheckView.build_response(body_part, symptoms, candidate_count, sorted_injuries)
+
+            logger.info(f"Batch injury check of {len(queries)} queries performed for user: {request.user.username}")
+            return Response({'results': results, 'total_queries': len(queries)})
+
+        except Exception as e:
+            logger.error(f"Error in batch injury check for user {request.user.username}: {str(e)}")
+            return Response(
+                {'error': 'Injury check failed due to an internal error. Please try again.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class InjuryCheckCacheStatsView(APIView):
+    """
+    Admin-only view exposing the injury check result cache's size, hit rate
+    and latency for this worker process, to help tune INJURY_CHECK_CACHE_SIZE.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_injury_check_cache().stats())
+
 
 class SupplementRecommendationView(APIView):
     """
@@ -478,6 +755,7 @@ class NutritionSummaryView(APIView):
     """
     API view for generating nutrition summary based on user profile.
     UPDATED to use a consistent, direct multiplier for protein calculation.
+    Serves the summary stored by precompute_plans when it is still valid.
     """
     permission_classes = [IsAuthenticated]
 
@@ -490,66 +768,11 @@ class NutritionSummaryView(APIView):
                     'error': 'Profile is incomplete. Please provide weight, height, age, and gender.'
                 }, status=status.HTTP_400_BAD_REQUEST)
 
-            bmr = profile.calculate_bmr()
-            if bmr is None:
-                 return Response({'error': 'Unable to calculate BMR.'}, status=status.HTTP_400_BAD_REQUEST)
-
-            activity_multipliers = {
-                'sedentary': 1.2, 'lightly_active': 1.375, 'moderately_active': 1.55,
-                'very_active': 1.725, 'extra_active': 1.9
-            }
-            maintenance_calories = bmr * activity_multipliers.get(profile.activity_level, 1.55)
-
-            if profile.goal == 'fat_loss':
-                target_calories = maintenance_calories - 500
-            elif profile.goal == 'muscle_gain':
-                target_calories = maintenance_calories + 300
-            else:
-                target_calories = maintenance_calories
-            
-            # --- UNIFIED PROTEIN LOGIC ---
-            # This is the corrected calculation based on goal and experience level.
-            if profile.goal == 'muscle_gain':
-                multipliers = {'beginner': 1.8, 'intermediate': 2.0, 'advanced': 2.2}
-            else: # fat_loss, maintenance, etc.
-                multipliers = {'beginner': 1.6, 'intermediate': 1.8, 'advanced': 2.0}
-            
-            protein_multiplier = multipliers.get(profile.experience_level, 1.8)
-            protein_grams = round(profile.weight * protein_multiplier)
-            # --- END OF CORRECTED LOGIC ---
-
-            # Calculate remaining calories for carbs and fat
-            protein_calories = protein_grams * 4
-            remaining_calories = target_calories - protein_calories
-            
-            # Distribute remaining calories (e.g., 50% carbs, 50% fat, can be adjusted)
-            carbs_grams = max(0, round((remaining_calories * 0.5) / 4))
-            fat_grams = max(0, round((remaining_calories * 0.5) / 9))
-
-            water_intake_ml = round((profile.weight * 35) + 500)
-
-            summary = {
-                'user_info': {
-                    'goal': profile.get_goal_display(),
-                    'activity_level': profile.get_activity_level_display(),
-                    'bmi': profile.bmi,
-                    'bmr': round(bmr)
-                },
-                'calories': {
-                    'maintenance': round(maintenance_calories),
-                    'target': round(target_calories),
-                },
-                'macros': {
-                    'protein_grams': protein_grams,
-                    'carbs_grams': carbs_grams,
-                    'fat_grams': fat_grams,
-                },
-                'hydration': {
-                    'daily_water_ml': water_intake_ml,
-                    'daily_water_liters': round(water_intake_ml / 1000, 2)
-                },
-                'tips': self._get_nutrition_tips(profile.goal)
-            }
+            summary = get_precomputed_payload(profile, 'nutrition_summary')
+            if summary is None:
+                summary = self.build_summary(profile)
+            if summary is None:
+                return Response({'error': 'Unable to calculate BMR.'}, status=status.HTTP_400_BAD_REQUEST)
 
             logger.info(f"Nutrition summary generated for user: {request.user.username}")
             return Response(summary)
@@ -560,7 +783,72 @@ class NutritionSummaryView(APIView):
             logger.error(f"Error in nutrition summary for {request.user.username}: {str(e)}")
             return Response({'error': 'Failed to generate nutrition summary.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _get_nutrition_tips(self, goal):
+    @classmethod
+    def build_summary(cls, profile):
+        """Nutrition summary for a complete profile, or None if BMR can't be calculated."""
+        bmr = profile.calculate_bmr()
+        if bmr is None:
+            return None
+
+        activity_multipliers = {
+            'sedentary': 1.2, 'lightly_active': 1.375, 'moderately_active': 1.55,
+            'very_active': 1.725, 'extra_active': 1.9
+        }
+        maintenance_calories = bmr * activity_multipliers.get(profile.activity_level, 1.55)
+
+        if profile.goal == 'fat_loss':
+            target_calories = maintenance_calories - 500
+        elif profile.goal == 'muscle_gain':
+            target_calories = maintenance_calories + 300
+        else:
+            target_calories = maintenance_calories
+        
+        # --- UNIFIED PROTEIN LOGIC ---
+        # This is the corrected calculation based on goal and experience level.
+        if profile.goal == 'muscle_gain':
+            multipliers = {'beginner': 1.8, 'intermediate': 2.0, 'advanced': 2.2}
+        else: # fat_loss, maintenance, etc.
+            multipliers = {'beginner': 1.6, 'intermediate': 1.8, 'advanced': 2.0}
+        
+        protein_multiplier = multipliers.get(profile.experience_level, 1.8)
+        protein_grams = round(profile.weight * protein_multiplier)
+        # --- END OF CORRECTED LOGIC ---
+
+        # Calculate remaining calories for carbs and fat
+        protein_calories = protein_grams * 4
+        remaining_calories = target_calories - protein_calories
+        
+        # Distribute remaining calories (e.g., 50% carbs, 50% fat, can be adjusted)
+        carbs_grams = max(0, round((remaining_calories * 0.5) / 4))
+        fat_grams = max(0, round((remaining_calories * 0.5) / 9))
+
+        water_intake_ml = round((profile.weight * 35) + 500)
+
+        return {
+            'user_info': {
+                'goal': profile.get_goal_display(),
+                'activity_level': profile.get_activity_level_display(),
+                'bmi': profile.bmi,
+                'bmr': round(bmr)
+            },
+            'calories': {
+                'maintenance': round(maintenance_calories),
+                'target': round(target_calories),
+            },
+            'macros': {
+                'protein_grams': protein_grams,
+                'carbs_grams': carbs_grams,
+                'fat_grams': fat_grams,
+            },
+            'hydration': {
+                'daily_water_ml': water_intake_ml,
+                'daily_water_liters': round(water_intake_ml / 1000, 2)
+            },
+            'tips': cls._get_nutrition_tips(profile.goal)
+        }
+
+    @staticmethod
+    def _get_nutrition_tips(goal):
         if goal == 'muscle_gain':
             return ['Focus on lean proteins.', 'Include complex carbs.', 'Don\'t forget healthy fats.']
         elif goal == 'fat_loss':
@@ -573,6 +861,7 @@ class PersonalizedMealPlanView(APIView):
     API view for generating a personalized meal plan with protein distribution.
     Can generate a full-day plan or provide multiple suggestions for a specific meal
     if a 'meal' query parameter is provided (e.g., ?meal=Lunch).
+    The full-day plan is served from precompute_plans' output when still valid.
     """
     permission_classes = [IsAuthenticated]
 
@@ -584,31 +873,9 @@ class PersonalizedMealPlanView(APIView):
                     'error': 'Profile is incomplete. Please provide weight, height, age, and gender to generate a meal plan.'
                 }, status=status.HTTP_400_BAD_REQUEST)
 
-            # --- Step 1: Calculate Total Daily Protein Needs ---
-            if profile.goal == 'muscle_gain':
-                multipliers = {'beginner': 1.8, 'intermediate': 2.0, 'advanced': 2.2}
-            else: # fat_loss, maintenance, etc.
-                multipliers = {'beginner': 1.6, 'intermediate': 1.8, 'advanced': 2.0}
-            
-            protein_multiplier = multipliers.get(profile.experience_level, 1.8) # Default to 1.8
-            total_protein_target = round(profile.weight * protein_multiplier)
-
-            # --- Step 2: Define Protein Distribution Across Meals ---
-            if profile.goal == 'muscle_gain':
-                distribution = {
-                    "Breakfast": 0.25, "Lunch": 0.30, "Post-Workout": 0.20, "Dinner": 0.25,
-                }
-            else:
-                distribution = {
-                    "Breakfast": 0.30, "Lunch": 0.35, "Snack": 0.10, "Dinner": 0.25,
-                }
-            
             # --- NEW: Check for a specific meal request ---
             meal_to_expand = request.query_params.get('meal')
-
-            # Determine user's diet preference
-            user_diet = profile.diet_preference
-            allowed_food_types = ['veg', 'non-veg'] if user_diet == 'both' else [user_diet]
+            total_protein_target, distribution, allowed_food_types = self._get_meal_targets(profile)
 
             # --- Logic for getting multiple suggestions for ONE meal ---
             if meal_to_expand and meal_to_expand in distribution:
@@ -623,24 +890,9 @@ class PersonalizedMealPlanView(APIView):
                 })
 
             # --- Original logic for generating the FULL daily plan ---
-            meal_plan = []
-            for meal, percentage in distribution.items():
-                meal_protein_target = round(total_protein_target * percentage)
-                # Get just the single best suggestion for the daily plan overview
-                suggestions = self._get_food_suggestions(meal, meal_protein_target, allowed_food_types, count=1)
-                
-                meal_plan.append({
-                    "meal": meal,
-                    "target_protein_g": meal_protein_target,
-                    "suggestions": suggestions
-                })
-
-            response_data = {
-                "user_goal": profile.goal,
-                "daily_protein_target_g": total_protein_target,
-                "meal_plan": meal_plan,
-                "disclaimer": "This is a sample plan. Click on a meal to see more options. Consult a nutritionist for a complete dietary plan."
-            }
+            response_data = get_precomputed_payload(profile, 'meal_plan')
+            if response_data is None:
+                response_data = self.build_meal_plan(profile)
             
             logger.info(f"Full meal plan generated for user: {request.user.username}")
             return Response(response_data)
@@ -651,7 +903,59 @@ class PersonalizedMealPlanView(APIView):
             logger.error(f"Error generating meal plan for user {request.user.username}: {str(e)}")
             return Response({'error': 'Failed to generate meal plan.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _get_food_suggestions(self, meal_name, protein_target, diet_preference, count=1):
+    @classmethod
+    def build_meal_plan(cls, profile):
+        """Full-day meal plan for a complete profile, one suggestion per meal."""
+        total_protein_target, distribution, allowed_food_types = cls._get_meal_targets(profile)
+
+        meal_plan = []
+        for meal, percentage in distribution.items():
+            meal_protein_target = round(total_protein_target * percentage)
+            # Get just the single best suggestion for the daily plan overview
+            suggestions = cls._get_food_suggestions(meal, meal_protein_target, allowed_food_types, count=1)
+            
+            meal_plan.append({
+                "meal": meal,
+                "target_protein_g": meal_protein_target,
+                "suggestions": suggestions
+            })
+
+        return {
+            "user_goal": profile.goal,
+            "daily_protein_target_g": total_protein_target,
+            "meal_plan": meal_plan,
+            "disclaimer": "This is a sample plan. Click on a meal to see more options. Consult a nutritionist for a complete dietary plan."
+        }
+
+    @staticmethod
+    def _get_meal_targets(profile):
+        """(daily protein target, protein share per meal, allowed food types) for a profile."""
+        # --- Step 1: Calculate Total Daily Protein Needs ---
+        if profile.goal == 'muscle_gain':
+            multipliers = {'beginner': 1.8, 'intermediate': 2.0, 'advanced': 2.2}
+        else: # fat_loss, maintenance, etc.
+            multipliers = {'beginner': 1.6, 'intermediate': 1.8, 'advanced': 2.0}
+        
+        protein_multiplier = multipliers.get(profile.experience_level, 1.8) # Default to 1.8
+        total_protein_target = round(profile.weight * protein_multiplier)
+
+        # --- Step 2: Define Protein Distribution Across Meals ---
+        if profile.goal == 'muscle_gain':
+            distribution = {
+                "Breakfast": 0.25, "Lunch": 0.30, "Post-Workout": 0.20, "Dinner": 0.25,
+            }
+        else:
+            distribution = {
+                "Breakfast": 0.30, "Lunch": 0.35, "Snack": 0.10, "Dinner": 0.25,
+            }
+
+        # Determine user's diet preference
+        user_diet = profile.diet_preference
+        allowed_food_types = ['veg', 'non-veg'] if user_diet == 'both' else [user_diet]
+        return total_protein_target, distribution, allowed_food_types
+
+    @staticmethod
+    def _get_food_suggestions(meal_name, protein_target, diet_preference, count=1):
         """
         Helper method to find food suggestions.
         'count' parameter determines how many suggestions to return.
@@ -706,145 +1010,284 @@ class PerformanceDashboardView(APIView):
     """
     API view to provide analytics on a user's performance data,
     including regression-based predictions for strength trends.
+    The window defaults to the last 90 days; ?range=<n><d|w|m|y> (e.g. 2y) or
+    ?start=&end= (ISO dates) pick another, up to 10 years, and ?granularity=
+    day|week|month sets the bucket size of the time series.
+    Everything is read from the UserDailyStats rollups (one row per day and
+    category) plus one grouped query for the most frequent activity and one for
+    the previous period's totals, so the cost depends on the number of days
+    trained, not on how many sets were logged.
+    Responses are cached per user and day under a version that every activity
+    write bumps (see dashboard_cache.py), so repeated loads are cache reads.
     """
     permission_classes = [IsAuthenticated]
 
+    STATS_COLUMNS = ['date', 'category', 'workout_count', 'total_duration', 'total_volume', 'set_count', 'exercise_stats']
+    SET_COLUMNS = ['date', 'exercise_name', 'weighted_sets', 'max_weight']
+    DEFAULT_WINDOW_DAYS = 90
+    MAX_WINDOW_DAYS = 3660
+    RANGE_UNIT_DAYS = {'d': 1, 'w': 7, 'm': 30, 'y': 365}
+    GRANULARITIES = ('day', 'week', 'month')
+
     def get(self, request, *args, **kwargs):
         user = request.user
-        start_date = timezone.now() - timedelta(days=90)
-        activities = Activity.objects.filter(
-            user=user, date__gte=start_date
-        ).prefetch_related('sets')
+        today = timezone.localdate()
+        try:
+            start_date, end_date, granularity = self._parse_window(request.query_params, today)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not activities.exists():
-            return Response({
-                "message": "No activity logged in the last 90 days. Start a workout to see your stats!",
+        variant = f'{start_date}:{end_date}:{granularity}'
+        return Response(get_or_build_dashboard(
+            user.id, today, lambda: self.build_dashboard(user, today, start_date, end_date, granularity), variant
+        ))
+
+    def _parse_window(self, params, today):
+        """(start date, end date, granularity) from the query params; raises ValueError."""
+        granularity = params.get('granularity', 'day')
+        if granularity not in self.GRANULARITIES:
+            raise ValueError(f"granularity must be one of: {', '.join(self.GRANULARITIES)}.")
+
+        try:
+            end_date = date.fromisoformat(params['end']) if params.get('end') else today
+            start_date = date.fromisoformat(params['start']) if params.get('start') else None
+        except ValueError:
+            raise ValueError('start and end must be dates in YYYY-MM-DD format.')
+
+        if start_date is None:
+            window_days = self.DEFAULT_WINDOW_DAYS
+            range_param = params.get('range')
+            if range_param:
+                count, unit = range_param[:-1], range_param[-1:].lower()
+                if not count.isdigit() or unit not in self.RANGE_UNIT_DAYS or int(count) == 0:
+                    raise ValueError('range must look like 30d, 12w, 6m or 2y.')
+                window_days = int(count) * self.RANGE_UNIT_DAYS[unit]
+            start_date = end_date - timedelta(days=min(window_days, self.MAX_WINDOW_DAYS))
+
+        if start_date > end_date:
+            raise ValueError('start must not be after end.')
+        if (end_date - start_date).days > self.MAX_WINDOW_DAYS:
+            raise ValueError(f'The window can span at most {self.MAX_WINDOW_DAYS} days.')
+        return start_date, end_date, granularity
+
+    def build_dashboard(self, user, today, start_date=None, end_date=None, granularity='day'):
+        end_date = end_date or today
+        start_date = start_date or end_date - timedelta(days=self.DEFAULT_WINDOW_DAYS)
+        stats = self._load_stats(user, start_date, end_date)
+
+        if stats.empty:
+            if end_date == today:
+                message = f"No activity logged in the last {(end_date - start_date).days} days. Start a workout to see your stats!"
+            else:
+                message = "No activity logged in the selected period."
+            return {
+                "message": message,
                 "summary_stats": {}, 
                 "weekly_frequency": [], 
                 "volume_over_time": [], 
                 "exercise_progress": [],
-                "activity_breakdown": [] # UPDATED: Include empty key
-            })
-            
-        summary_stats = self._get_summary_stats(activities)
-        weekly_frequency = self._get_weekly_frequency(activities)
-        volume_over_time = self._get_volume_over_time(activities)
-        exercise_progress = self._get_exercise_progress_with_prediction(activities)
+                "exercise_trends": [],
+                "activity_breakdown": [], # UPDATED: Include empty key
+                "period_summary": {},
+                "series": [],
+            }
+
+        # The 30-day summary and breakdown cover the end of the window
+        month_start = end_date - timedelta(days=30)
+        stats_30d = stats[stats['date'] >= month_start]
+        sets = self._weighted_exercise_days(stats)
+        summary_stats = self._get_summary_stats(user, stats_30d, month_start, end_date)
+        weekly_frequency = self._get_weekly_frequency(stats)
+        volume_over_time = self._get_volume_over_time(stats, sets, granularity)
+        exercise_progress, exercise_trends = self._get_exercise_progress_with_prediction(sets)
         # NEW: Get the activity breakdown data
-        activity_breakdown = self._get_activity_breakdown(activities)
+        activity_breakdown = self._get_activity_breakdown(stats_30d)
 
         response_data = {
             "summary_stats": summary_stats,
             "weekly_frequency": weekly_frequency,
             "volume_over_time": volume_over_time,
             "exercise_progress": exercise_progress,
+            "exercise_trends": exercise_trends,
             "activity_breakdown": activity_breakdown, # NEW: Add to response
+            "period_summary": self._get_period_summary(user, stats, start_date, end_date),
+            "series": self._get_series(stats, granularity),
         }
         
-        return Response(response_data)
-
-    def _get_summary_stats(self, activities):
-        # This method is correct and remains the same
-        last_30_days_start = timezone.now() - timedelta(days=30)
-        activities_30d = activities.filter(date__gte=last_30_days_start)
-        total_volume = SetLog.objects.filter(
-            activity__in=activities_30d, weight_kg__isnull=False, reps__isnull=False
-        ).aggregate(total=Sum(F('weight_kg') * F('reps')))['total'] or 0
-        most_frequent = activities_30d.values('name').annotate(
-            count=Count('id')
-        ).order_by('-count').first()
+        return response_data
+
+    def _load_stats(self, user, start_date, end_date):
+        """The window's daily rollup rows as a DataFrame."""
+        rows = UserDailyStats.objects.filter(
+            user=user, date__gte=start_date, date__lte=end_date
+        ).order_by().values_list(*self.STATS_COLUMNS)
+        return pd.DataFrame.from_records(list(rows), columns=self.STATS_COLUMNS)
+
+    @staticmethod
+    def _bucket_starts(dates, granularity):
+        """Each date's bucket: itself, the Monday of its week, or the 1st of its month."""
+        if granularity == 'week':
+            return dates.map(lambda day: day - timedelta(days=day.weekday()))
+        if granularity == 'month':
+            return dates.map(lambda day: day.replace(day=1))
+        return dates
+
+    @staticmethod
+    def _totals(workouts, duration, volume, set_count):
+        return {
+            "workouts": int(workouts or 0),
+            "duration": int(duration or 0),
+            "total_volume": round(float(volume or 0), 2),
+            "sets": int(set_count or 0),
+        }
+
+    def _get_period_summary(self, user, stats, start_date, end_date):
+        """Totals of the window and of the equally long period just before it (e.g. the previous year)."""
+        previous_end = start_date - timedelta(days=1)
+        previous_start = previous_end - (end_date - start_date)
+        previous = UserDailyStats.objects.filter(
+            user=user, date__gte=previous_start, date__lte=previous_end
+        ).aggregate(
+            workouts=Sum('workout_count'), duration=Sum('total_duration'),
+            volume=Sum('total_volume'), set_count=Sum('set_count')
+        )
         return {
-            "total_workouts_last_30d": activities_30d.count(),
-            "total_volume_last_30d": round(total_volume, 2),
-            "most_frequent_activity": most_frequent['name'] if most_frequent else "N/A"
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            **self._totals(
+                stats['workout_count'].sum(), stats['total_duration'].sum(),
+                stats['total_volume'].sum(), stats['set_count'].sum()
+            ),
+            "previous_period": {
+                "start": previous_start.isoformat(),
+                "end": previous_end.isoformat(),
+                **self._totals(**previous),
+            },
         }
 
-    def _get_weekly_frequency(self, activities):
-        # This method is correct and remains the same
-        frequency_data = activities.annotate(
-            week=TruncWeek('date')
-        ).values('week').annotate(count=Count('id')).order_by('week')
+    def _get_series(self, stats, granularity):
+        buckets = stats.groupby(self._bucket_starts(stats['date'], granularity))[
+            ['workout_count', 'total_duration', 'total_volume', 'set_count']
+        ].sum().sort_index()
         return [
-            {"week": item['week'].strftime("%Y-%W"), "workouts": item['count']}
-            for item in frequency_data
+            {"period": period.isoformat(), **self._totals(*row)}
+            for period, row in zip(buckets.index, buckets.itertuples(index=False))
         ]
 
-    def _get_volume_over_time(self, activities):
-        # This method is correct and remains the same
-        daily_volumes = {}
-        strength_activities = activities.filter(sets__weight_kg__isnull=False, sets__reps__isnull=False).distinct()
-        for activity in strength_activities:
-            daily_volume = activity.sets.aggregate(total=Sum(F('weight_kg') * F('reps')))['total'] or 0
-            date_str = activity.date.isoformat()
-            if date_str in daily_volumes:
-                daily_volumes[date_str] += daily_volume
-            else:
-                daily_volumes[date_str] = daily_volume
-        sorted_volumes = sorted(daily_volumes.items())
-        return [{"date": date, "total_volume": round(volume, 2)} for date, volume in sorted_volumes]
-
-    def _get_exercise_progress_with_prediction(self, activities):
-        # This method is correct and remains the same
-        all_sets = SetLog.objects.filter(activity__in=activities, weight_kg__isnull=False)
-        top_exercises = all_sets.values('exercise_name').annotate(count=Count('id')).order_by('-count')[:3]
-        progress_data = []
-        for item in top_exercises:
-            exercise_name = item['exercise_name']
-            daily_max_weight = all_sets.filter(exercise_name=exercise_name).values('activity__date').annotate(
-                max_weight=Max('weight_kg')
-            ).order_by('activity__date')
-            
-            if len(daily_max_weight) >= 3:
-                dates = [entry['activity__date'] for entry in daily_max_weight]
-                weights = [entry['max_weight'] for entry in daily_max_weight]
-                first_day = dates[0]
-                days_since_start = np.array([(d - first_day).days for d in dates]).reshape(-1, 1)
-                model = LinearRegression()
-                model.fit(days_since_start, weights)
-                last_day_num = (dates[-1] - first_day).days
-                pred_in_7_days = model.predict(np.array([[last_day_num + 7]]))[0]
-                pred_in_30_days = model.predict(np.array([[last_day_num + 30]]))[0]
-                slope = model.coef_[0]
-                if slope > 0.1: trend = "Improving"
-                elif slope < -0.1: trend = "Declining"
-                else: trend = "Stagnant"
-                prediction = {
-                    "next_week_weight": round(pred_in_7_days, 1),
-                    "next_month_weight": round(pred_in_30_days, 1),
-                    "trend": trend
-                }
-            else:
-                prediction = { "message": "Not enough data to predict a trend." }
+    def _weighted_exercise_days(self, stats):
+        """One row per day and exercise with weighted sets, across categories."""
+        records = [
+            (day, exercise_name, values['weighted_sets'], values['max_weight'])
+            for day, exercise_stats in zip(stats['date'], stats['exercise_stats'])
+            for exercise_name, values in exercise_stats.items()
+            if values['weighted_sets']
+        ]
+        sets = pd.DataFrame.from_records(records, columns=self.SET_COLUMNS)
+        return sets.groupby(['date', 'exercise_name'], as_index=False).agg(
+            weighted_sets=('weighted_sets', 'sum'), max_weight=('max_weight', 'max')
+        )
+
+    def _get_summary_stats(self, user, stats_30d, month_start, end_date):
+        # Activity names aren't rolled up; one grouped query over the month
+        most_frequent = Activity.objects.filter(
+            user=user, date__gte=month_start, date__lte=end_date
+        ).order_by().values(
+            'name'
+        ).annotate(count=Count('id')).order_by('-count', 'name').values_list('name', flat=True).first()
+        return {
+            "total_workouts_last_30d": int(stats_30d['workout_count'].sum()),
+            "total_volume_last_30d": round(float(stats_30d['total_volume'].sum()), 2),
+            "most_frequent_activity": most_frequent or "N/A"
+        }
+
+    def _get_weekly_frequency(self, stats):
+        # Weeks start on Monday, like TruncWeek
+        week_starts = stats['date'].map(lambda day: day - timedelta(days=day.weekday()))
+        frequency_data = stats['workout_count'].groupby(week_starts).sum().sort_index()
+        return [
+            {"week": week.strftime("%Y-%W"), "workouts": int(count)}
+            for week, count in frequency_data.items()
+        ]
+
+    def _get_volume_over_time(self, stats, sets, granularity='day'):
+        # Days with weighted sets; only weighted sets carry volume. Dated by bucket start.
+        weighted = stats[stats['date'].isin(set(sets['date']))]
+        volumes = weighted.groupby(self._bucket_starts(weighted['date'], granularity))['total_volume'].sum().sort_index()
+        return [{"date": day.isoformat(), "total_volume": round(float(volume), 2)} for day, volume in volumes.items()]
+
+    def _get_exercise_progress_with_prediction(self, sets):
+        """
+        Fits a strength trend for every exercise with weighted sets in the window,
+        all at once (see trends.fit_linear_trends). Returns the charted progress
+        of the top 3 exercises and the trends of all of them.
+        """
+        if sets.empty:
+            return [], []
+        # Most weighted sets first, ties by name
+        set_counts = sets.groupby('exercise_name')['weighted_sets'].sum()
+        exercise_names = sorted(set_counts.index, key=lambda name: (-set_counts[name], name))
+
+        sets = sets.sort_values(['exercise_name', 'date'])
+        codes = pd.Categorical(sets['exercise_name'], categories=exercise_names).codes
+        day_numbers = sets['date'].map(date.toordinal).to_numpy()
+        weights = sets['max_weight'].to_numpy(dtype=float)
+        fits = fit_linear_trends(codes, day_numbers, weights, len(exercise_names))
+
+        predictions = [self._build_prediction(fits, code) for code in range(len(exercise_names))]
+        exercise_trends = [
+            {"exercise_name": name, "data_points": int(fits['n'][code]), **prediction}
+            for code, (name, prediction) in enumerate(zip(exercise_names, predictions))
+        ]
 
+        progress_data = []
+        for code, exercise_name in enumerate(exercise_names[:3]):
+            exercise_sets = sets[codes == code]
             progress_data.append({
                 "exercise_name": exercise_name,
-                "progress": [{"date": entry['activity__date'].isoformat(), "max_weight": entry['max_weight']} for entry in daily_max_weight],
-                "prediction": prediction
+                "progress": [
+                    {"date": day.isoformat(), "max_weight": float(weight)}
+                    for day, weight in zip(exercise_sets['date'], exercise_sets['max_weight'])
+                ],
+                "prediction": predictions[code]
             })
-        return progress_data
-    
-    # --- NEW: Helper method for the doughnut chart ---
-    def _get_activity_breakdown(self, activities):
-        """Calculates the count of activities per category for the doughnut chart."""
-        last_30_days_start = timezone.now() - timedelta(days=30)
-        activities_30d = activities.filter(date__gte=last_30_days_start)
+        return progress_data, exercise_trends
 
-        breakdown = activities_30d.values(
-            'fitness_activity__category' # Group by the category of the linked FitnessActivity
-        ).annotate(
-            count=Count('id')
-        ).order_by('-count')
+    @staticmethod
+    def _build_prediction(fits, code):
+        slope = fits['slope'][code]
+        if np.isnan(slope):
+            return { "message": "Not enough data to predict a trend." }
+        return {
+            "next_week_weight": round(float(fits['projection_7'][code]), 1),
+            "next_week_range": [
+                round(float(fits['projection_7_low'][code]), 1), round(float(fits['projection_7_high'][code]), 1)
+            ],
+            "next_month_weight": round(float(fits['projection_30'][code]), 1),
+            "next_month_range": [
+                round(float(fits['projection_30_low'][code]), 1), round(float(fits['projection_30_high'][code]), 1)
+            ],
+            "slope_per_day": round(float(slope), 3),
+            "slope_range": [round(float(fits['slope_low'][code]), 3), round(float(fits['slope_high'][code]), 3)],
+            "trend": trend_label(slope)
+        }
 
-        # Filter out null categories if any activities are not linked
+    def _get_activity_breakdown(self, stats_30d):
+        """Calculates the count of activities per category for the doughnut chart."""
+        # Unlinked activities have no category and are left out
+        linked = stats_30d[stats_30d['category'] != '']
+        breakdown = linked.groupby('category')['workout_count'].sum().sort_values(ascending=False, kind='stable')
         return [
-            {"category": item['fitness_activity__category'], "count": item['count']}
-            for item in breakdown if item['fitness_activity__category']
+            {"category": category, "count": int(count)}
+            for category, count in breakdown.items()
         ]
     
 class CalendarLogView(APIView):
     """
     Provides a summary of logged activities for a given month and year,
     structured for a calendar view with color-coding by category.
+    With ?summary=1 only per-day totals are returned (workout count, category
+    mix, duration and volume), read from the daily rollups in one query; the
+    full activities of a day come from CalendarDayLogView when it is opened.
     """
     permission_classes = [IsAuthenticated]
 
@@ -860,11 +1303,27 @@ class CalendarLogView(APIView):
         except (ValueError, TypeError):
             return Response({'error': 'Invalid year or month format.'}, status=400)
 
+        try:
+            month_start = datetime.date(year, month, 1)
+        except ValueError:
+            return Response({'error': 'Invalid year or month format.'}, status=400)
+        # The last day rather than the next month's first, which doesn't exist for December 9999
+        month_end = month_start.replace(day=monthrange(year, month)[1])
+
+        if request.query_params.get('summary') in ('1', 'true'):
+            return Response({
+                "year": year,
+                "month": month,
+                "days": self._get_day_summaries(request.user, month_start, month_end),
+                "category_colors": self.CATEGORY_COLORS
+            })
+
+        # A plain date range (rather than date__month) can use the (user, date) index
         activities = Activity.objects.filter(
             user=request.user,
-            date__year=year,
-            date__month=month
-        ).prefetch_related('sets').order_by('timestamp') # Order by time
+            date__gte=month_start,
+            date__lte=month_end
+        ).select_related('fitness_activity').prefetch_related('sets').order_by('timestamp') # Order by time
 
         # UPDATED: Serialize the full activity data and group it by day
         serialized_data = ActivitySerializer(activities, many=True).data
@@ -879,6 +1338,48 @@ class CalendarLogView(APIView):
             "logs": logs_by_day,
             "category_colors": self.CATEGORY_COLORS
         })
+
+    @staticmethod
+    def _get_day_summaries(user, month_start, month_end):
+        """Day -> totals for the month, from its (date, category) rollup rows."""
+        rows = UserDailyStats.objects.filter(
+            user=user, date__gte=month_start, date__lte=month_end
+        ).order_by('date', 'category').values_list('date', 'category', 'workout_count', 'total_duration', 'total_volume')
+
+        days = {}
+        for day, category, workouts, duration, volume in rows:
+            summary = days.setdefault(day.isoformat(), {
+                "workouts": 0, "categories": {}, "duration": 0, "total_volume": 0.0
+            })
+            summary["workouts"] += workouts
+            # Unlinked activities show as 'Other'
+            category = category or 'Other'
+            summary["categories"][category] = summary["categories"].get(category, 0) + workouts
+            summary["duration"] += duration
+            summary["total_volume"] = round(summary["total_volume"] + volume, 2)
+        return days
+
+
+class CalendarDayLogView(APIView):
+    """
+    Returns the full activities, with their sets, logged on one day
+    (GET /api/calendar-logs/<YYYY-MM-DD>/), for the calendar's day detail.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, day, *args, **kwargs):
+        try:
+            log_date = date.fromisoformat(day)
+        except ValueError:
+            return Response({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
+
+        activities = Activity.objects.filter(
+            user=request.user, date=log_date
+        ).select_related('fitness_activity').prefetch_related('sets').order_by('timestamp')
+        return Response({
+            "date": log_date.isoformat(),
+            "logs": ActivitySerializer(activities, many=True).data
+        })
     
 class TrainingCategoryDetailView(generics.RetrieveAPIView):
     """
@@ -905,6 +1406,18 @@ class AchievementListView(generics.ListAPIView):
     serializer_class = AchievementSerializer
     permission_classes = [IsAuthenticated]
 
+class PersonalRecordListView(generics.ListAPIView):
+    """
+    API view listing the user's personal record for every exercise, served from
+    the maintained PersonalRecord rows in one query (no pagination count).
+    """
+    serializer_class = PersonalRecordSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        return PersonalRecord.objects.filter(user=self.request.user).order_by('exercise_name')
+
 class UserProgressView(APIView):
     """
     API view to check, update, and return the user's progress on all active achievements.
@@ -921,6 +1434,15 @@ class UserProgressView(APIView):
         active_achievements = Achievement.objects.filter(is_active=True)
         user_achievements_status = []
 
+        # This month's totals per category, from the daily rollups in one query
+        monthly_totals = {
+            row['category']: row for row in UserDailyStats.objects.filter(
+                user=user, date__gte=start_of_month
+            ).order_by().values('category').annotate(
+                volume=Sum('total_volume'), duration=Sum('total_duration'), frequency=Sum('workout_count')
+            )
+        }
+
         for achievement in active_achievements:
             user_achievement, created = UserAchievement.objects.get_or_create(
                 user=user,
@@ -934,25 +1456,8 @@ class UserProgressView(APIView):
                 continue
 
             # --- Calculate current progress based on the achievement's metric for the current month ---
-            current_progress = 0
-            user_activities = Activity.objects.filter(
-                user=user, 
-                date__gte=start_of_month,
-                fitness_activity__category=achievement.category
-            )
-
-            if achievement.metric == 'volume':
-                volume_data = SetLog.objects.filter(
-                    activity__in=user_activities, weight_kg__isnull=False, reps__isnull=False
-                ).aggregate(total_volume=Sum(F('weight_kg') * F('reps')))
-                current_progress = volume_data.get('total_volume') or 0
-
-            elif achievement.metric == 'duration':
-                duration_data = user_activities.aggregate(total_duration=Sum('duration'))
-                current_progress = duration_data.get('total_duration') or 0
-
-            elif achievement.metric == 'frequency':
-                current_progress = user_activities.count()
+            totals = monthly_totals.get(achievement.category, {})
+            current_progress = totals.get(achievement.metric) or 0
 
             # Update the user's progress value
             user_achievement.progress_value = round(current_progress, 2)
@@ -997,9 +1502,10 @@ class CompetitionTypeDetailView(generics.RetrieveAPIView):
     serializer_class = CompetitionTypeDetailSerializer
     permission_classes = [IsAuthenticated]
 
-class ActivityDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ActivityDetailView(StatementCountMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API view for retrieving, updating, and deleting a single user activity.
+    Reports the SQL statements each request issued in X-DB-Statements.
     """
     serializer_class = ActivitySerializer
     permission_classes = [IsAuthenticated]
@@ -1009,6 +1515,39 @@ class ActivityDetailView(generics.RetrieveUpdateDestroyAPIView):
         This ensures that users can only access and modify their own activities.
         """
         return Activity.objects.filter(user=self.request.user)
+
+    def perform_destroy(self, instance):
+        # Tombstone for syncing clients; the activity's sets go with it, and may
+        # have held personal records
+        with transaction.atomic():
+            activity_id = instance.pk
+            exercise_names = set(instance.sets.values_list('exercise_name', flat=True))
+            instance.delete()
+            record_deletions(instance.user_id, 'activity', [activity_id])
+            refresh_daily_stats(instance.user_id, [instance.date])
+            recompute_personal_records(instance.user_id, exercise_names)
+
+class ActivitySyncView(APIView):
+    """
+    API view for incremental sync of offline clients.
+    GET /api/sync/?cursor=<cursor> returns the activities, sets and health logs
+    created or updated since the cursor, the ids deleted since then, and a new
+    cursor. Omit the cursor for a full initial sync. While has_more is true the
+    client should call again straight away with the new cursor.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            changes = changes_since(request.user, request.query_params.get('cursor'))
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Error syncing changes for user {request.user.username}: {str(e)}")
+            return Response({'error': 'Sync failed. Please try again.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        logger.info(f"Sync for user {request.user.username}: {len(changes['activities'])} activities, {len(changes['sets'])} sets changed")
+        return Response(changes)
     
 class LogHealthDataView(generics.CreateAPIView):
     """
@@ -0,0 +1,105 @@
+import json
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+import django
+import numpy as np
+
+# Benchmarks the injury-check scoring path against synthetic corpora.
+# Usage: python benchmark_injury_scoring.py [corpus sizes...]
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INJURY_FILE = os.path.join(BASE_DIR, 'api', 'datasets', 'injuries.json')
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+QUERIES = 200
+REPEATS = 3
+
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+from sklearn.metrics.pairwise import cosine_similarity  # noqa: E402
+
+from api.injury_index import InjuryIndex, MIN_SIMILARITY  # noqa: E402
+
+
+def build_corpus(size, rng):
+    """Synthesizes `size` injuries from the words and body parts in injuries.json."""
+    with open(INJURY_FILE, 'r', encoding='utf-8') as f:
+        seed_injuries = json.load(f)
+    parts = sorted({injury['affected_part'] for injury in seed_injuries})
+    words = sorted({
+        word.strip(',.').lower()
+        for injury in seed_injuries
+        for word in injury['symptoms'].split()
+    })
+    # Extra vocabulary so larger corpora don't collapse onto a few hundred terms
+    words += [f'term{n}' for n in range(size // 10)]
+
+    return [
+        SimpleNamespace(
+            pk=n,
+            name=f'Injury {n}',
+            affected_part=rng.choice(parts),
+            symptoms=' '.join(rng.sample(words, rng.randint(3, 8))),
+        )
+        for n in range(size)
+    ], parts, words
+
+
+def full_sort_scoring(index, text, rows, limit=5):
+    """The previous post-processing: python list, tuples, full sort, then slice."""
+    sim_scores = list(cosine_similarity(index.vectorizer.transform([text]), index.matrix[rows])[0])
+    injury_scores = [
+        (index.injuries[row], sim_scores[i])
+        for i, row in enumerate(rows)
+        if sim_scores[i] > MIN_SIMILARITY
+    ]
+    return sorted(injury_scores, key=lambda x: x[1], reverse=True)[:limit]
+
+
+def time_it(fn):
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(sizes):
+    rng = random.Random(42)
+    print(f"{'injuries':>10} {'fit (s)':>10} {'full sort (ms/q)':>18} {'top-k (ms/q)':>14} {'batch (ms/q)':>14}")
+
+    for size in sizes:
+        injuries, parts, words = build_corpus(size, rng)
+        start = time.perf_counter()
+        index = InjuryIndex(injuries)
+        fit_seconds = time.perf_counter() - start
+
+        # Score against every row so post-processing cost scales with the corpus
+        all_rows = np.arange(len(index), dtype=np.intp)
+        texts = [' '.join(rng.sample(words, 3)) for _ in range(QUERIES)]
+
+        full_sort = time_it(lambda: [full_sort_scoring(index, text, all_rows) for text in texts])
+        top_k = time_it(lambda: [index.score(text, all_rows) for text in texts])
+        batch = time_it(lambda: index.score_many(texts, [all_rows] * len(texts)))
+
+        # Both paths must agree on the returned injuries
+        for text in texts[:10]:
+            expected = [(injury.pk, round(score, 9)) for injury, score in full_sort_scoring(index, text, all_rows)]
+            actual = [(injury.pk, round(score, 9)) for injury, score in index.score(text, all_rows)]
+            assert expected == actual, f"Mismatch for {text!r}: {expected} != {actual}"
+
+        print(
+            f"{size:>10} {fit_seconds:>10.2f} {full_sort / QUERIES * 1000:>18.3f}"
+            f" {top_k / QUERIES * 1000:>14.3f} {batch / QUERIES * 1000:>14.3f}"
+        )
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    run_benchmark(sizes)
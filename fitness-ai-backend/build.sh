@@ -8,5 +8,8 @@ pip install -r requirements.txt
 # Run migrations
 python manage.py migrate --noinput
 
+# Compile the injury index that workers memory-map instead of fitting it
+python manage.py compile_injury_index
+
 # Collect static files
 python manage.py collectstatic --noinput
@@ -163,6 +163,11 @@ CORS_ALLOWED_HEADERS = [
     'x-requested-with',
 ]
 
+# Response headers the frontend may read (statement counts on activity writes)
+CORS_EXPOSE_HEADERS = [
+    'x-db-statements',
+]
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
@@ -258,12 +263,33 @@ if not DEBUG:
     X_FRAME_OPTIONS = 'DENY'
 
 # Cache settings (optional - for better performance)
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+# Dataset versions are kept in the database, so cached data is invalidated in
+# every process. Set REDIS_URL to share cached dashboards and their build locks
+# between workers as well.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            },
+        }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+        }
+    }
+
+# Maximum number of memoized injury check results kept per worker process
+INJURY_CHECK_CACHE_SIZE = 2048
+
+# Compiled injury index shared by all workers through memory mapping
+# (see `python manage.py compile_injury_index`). Set to None to always fit in-process.
+INJURY_INDEX_ARTIFACT_DIR = BASE_DIR / 'artifacts' / 'injury_index'
 
 # Email settings (for password reset, etc.)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development
@@ -90,8 +90,9 @@ const CalendarLog = () => {
                 setLoading(true);
                 const year = currentDate.getFullYear();
                 const month = currentDate.getMonth() + 1;
-                const response = await calendarAPI.getLogs(year, month);
-                setLogs(response.data.logs);
+                // Per-day totals only; a day's activities are loaded when it is clicked
+                const response = await calendarAPI.getMonthSummary(year, month);
+                setLogs(response.data.days);
                 setColors(response.data.category_colors);
             } catch (err) {
                 setError(handleAPIError(err));
@@ -106,7 +107,7 @@ const CalendarLog = () => {
         if (view === 'month') {
             const dateString = getLocalDateString(date);
             if (logs[dateString]) {
-                const categories = [...new Set(logs[dateString].map(act => act.category))];
+                const categories = Object.keys(logs[dateString].categories);
                 return (
                     <div className="workout-dots">
                         {categories.map(category => (
@@ -119,13 +120,18 @@ const CalendarLog = () => {
         return null;
     };
 
-    const handleDayClick = (clickedDate) => {
+    const handleDayClick = async (clickedDate) => {
         const dateString = getLocalDateString(clickedDate);
         if (logs[dateString]) {
-            setSelectedDateData({
-                date: dateString,
-                activities: logs[dateString]
-            });
+            try {
+                const response = await calendarAPI.getDayLogs(dateString);
+                setSelectedDateData({
+                    date: dateString,
+                    activities: response.data.logs
+                });
+            } catch (err) {
+                setError(handleAPIError(err));
+            }
         }
     };
 
@@ -23,7 +23,7 @@ const FitnessPlan = () => {
         try {
             setLoading(true);
             setError('');
-            const response = await fitnessAPI.getPlan();
+            const response = await fitnessAPI.getPlan({ mode: 'weekly' });
             setPlan(response.data.plan || []);
         } catch (error) {
             console.error("Failed to fetch fitness plan:", error);
@@ -20,7 +20,7 @@ const AiCoachCard = () => {
             try {
                 setLoading(true);
                 const [planResult, nutritionResult, analysisResult] = await Promise.allSettled([
-                    fitnessAPI.getPlan(),
+                    fitnessAPI.getPlan({ mode: 'weekly' }),
                     nutritionAPI.getSummary(),
                     healthAPI.getAnalysis(),
                 ]);
@@ -52,7 +52,7 @@ const WeeklyProgressCard = () => {
                     const startOfWeekStr = startOfWeek.toISOString().split('T')[0];
 
                     const [planRes, performanceRes, activitiesRes] = await Promise.allSettled([
-                        fitnessAPI.getPlan(),
+                        fitnessAPI.getPlan({ mode: 'weekly' }),
                         performanceAPI.getDashboard(),
                         activitiesAPI.list({ date_after: startOfWeekStr })
                     ]);
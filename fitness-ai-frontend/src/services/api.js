@@ -69,6 +69,8 @@ export const activitiesAPI = {
     create: (data) => apiClient.post('/activities/', data),
     update: (id, data) => apiClient.patch(`/activities/${id}/`, data), // Kept for future use
     delete: (id) => apiClient.delete(`/activities/${id}/`), // Kept for future use
+    bulkImport: (activities) => apiClient.post('/activities/bulk/', { activities }),
+    exportHistory: (output = 'csv') => apiClient.get('/activities/export/', { params: { output }, responseType: 'blob' }),
 };
 
 // NEW: API for the list of predefined fitness activities (for dropdowns)
@@ -77,7 +79,8 @@ export const fitnessActivitiesAPI = {
 };
 
 export const fitnessAPI = {
-    getPlan: () => apiClient.get('/fitness-plan/'),
+    // Pass { mode: 'weekly' } for the plan that stays fixed for the current week
+    getPlan: (params) => apiClient.get('/fitness-plan/', { params }),
 };
 
 export const injuryAPI = {
@@ -102,12 +105,15 @@ export const trainingAPI = {
 
 
 export const performanceAPI = {
-    getDashboard: () => apiClient.get('/performance-dashboard/'),
+    getDashboard: (params) => apiClient.get('/performance-dashboard/', { params }),
+    getPersonalRecords: () => apiClient.get('/personal-records/'),
 };
 
 
 export const calendarAPI = {
     getLogs: (year, month) => apiClient.get(`/calendar-logs/?year=${year}&month=${month}`),
+    getMonthSummary: (year, month) => apiClient.get('/calendar-logs/', { params: { year, month, summary: 1 } }),
+    getDayLogs: (dateString) => apiClient.get(`/calendar-logs/${dateString}/`),
 };
 
 export const championSpaceAPI = {